@@ -0,0 +1,69 @@
+"""Runtime of `TimeSeriesDataset.append` and `TimeSeriesDataset.trim_dataset`.
+
+The first table keeps the number of rows fixed and increases the number of
+series, the second one keeps the number of series fixed and increases the
+number of rows. Both operations should scale with the rows, not the series.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from neuralforecast.tsdataset import TimeSeriesDataset
+
+
+def make_dataset(n_series, n_rows, n_cols):
+    sizes = np.full(n_series, n_rows // n_series)
+    indptr = np.append(0, sizes.cumsum()).astype(np.int32)
+    return TimeSeriesDataset(
+        temporal=torch.rand(indptr[-1], n_cols),
+        temporal_cols=pd.Index([f"col_{i}" for i in range(n_cols)]),
+        indptr=indptr,
+        max_size=sizes.max(),
+        min_size=sizes.min(),
+        y_idx=0,
+    )
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(n_series, n_rows, n_cols, h, repeats):
+    dataset = make_dataset(n_series, n_rows, n_cols)
+    futr_dataset = make_dataset(n_series, n_series * h, n_cols)
+    return dict(
+        series=n_series,
+        rows=dataset.temporal.shape[0],
+        append_s=best_of(lambda: dataset.append(futr_dataset), repeats),
+        trim_s=best_of(
+            lambda: TimeSeriesDataset.trim_dataset(dataset, left_trim=1, right_trim=h),
+            repeats,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_cols", type=int, default=4)
+    parser.add_argument("--h", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    by_series = [
+        run(n_series, 4_000_000, args.n_cols, args.h, args.repeats)
+        for n_series in (1_000, 10_000, 100_000, 200_000)
+    ]
+    print(pd.DataFrame(by_series).round(4).to_string(index=False), end="\n\n")
+    by_rows = [
+        run(10_000, n_rows, args.n_cols, args.h, args.repeats)
+        for n_rows in (1_000_000, 2_000_000, 4_000_000, 8_000_000)
+    ]
+    print(pd.DataFrame(by_rows).round(4).to_string(index=False))
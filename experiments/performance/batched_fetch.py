@@ -0,0 +1,61 @@
+"""Runtime of iterating a `TimeSeriesLoader` with per-item and batched fetches.
+
+The per-item version hides `__getitems__`, so the loader builds one dict per
+series and stacks them, the batched version gathers each batch at once.
+"""
+import argparse
+import time
+
+import pandas as pd
+import torch
+
+from neuralforecast.tsdataset import TimeSeriesDataset, TimeSeriesLoader
+from neuralforecast.utils import generate_series
+
+
+class PerItem(torch.utils.data.Dataset):
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __getitem__(self, idx):
+        return self.dataset[idx]
+
+    def __len__(self):
+        return len(self.dataset)
+
+
+def epoch_time(dataset, batch_size, repeats):
+    loader = TimeSeriesLoader(dataset, batch_size=batch_size, shuffle=False)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in loader:
+            pass
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=20_000)
+    parser.add_argument("--batch_size", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for length in (50, 200, 1_000):
+        df = generate_series(
+            n_series=args.n_series,
+            min_length=length // 2,
+            max_length=length,
+            n_temporal_features=2,
+        )
+        dataset, *_ = TimeSeriesDataset.from_df(df)
+        results.append(
+            dict(
+                max_length=length,
+                per_item_s=epoch_time(PerItem(dataset), args.batch_size, args.repeats),
+                batched_s=epoch_time(dataset, args.batch_size, args.repeats),
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
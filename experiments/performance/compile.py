@@ -0,0 +1,89 @@
+"""Training throughput with `torch.compile` of the forward passes.
+
+Fits models of the different base classes eagerly and with `compile=True`. The
+compilation happens on the first steps, so the steps per second are measured once
+the first `--warmup_steps` are done, along with the total fit time.
+"""
+import argparse
+import logging
+import time
+
+import pandas as pd
+from pytorch_lightning.callbacks import Callback
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import NHITS, TFT, PatchTST, TSMixer
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+MODELS = {
+    "NHITS": (NHITS, dict(mlp_units=3 * [[512, 512]], windows_batch_size=256)),
+    "PatchTST": (PatchTST, dict(hidden_size=128, windows_batch_size=256)),
+    "TFT": (TFT, dict(hidden_size=128, windows_batch_size=256)),
+    "TSMixer": (TSMixer, dict(n_series=32, ff_dim=256, batch_size=64)),
+}
+
+
+class StepTimer(Callback):
+    def __init__(self, warmup_steps):
+        self.warmup_steps = warmup_steps
+        self.start = None
+
+    def on_train_batch_end(self, trainer, pl_module, outputs, batch, batch_idx):
+        if trainer.global_step == self.warmup_steps:
+            self.start = time.perf_counter()
+        self.end = time.perf_counter()
+
+    def steps_per_second(self, max_steps):
+        return (max_steps - self.warmup_steps) / (self.end - self.start)
+
+
+def fit(df, name, compile, max_steps, warmup_steps):
+    model_cls, kwargs = MODELS[name]
+    model = model_cls(
+        h=24,
+        input_size=96,
+        max_steps=max_steps,
+        val_check_steps=max_steps,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+        callbacks=[StepTimer(warmup_steps)],
+        compile=compile,
+        **kwargs,
+    )
+    nf = NeuralForecast(models=[model], freq="D")
+    start = time.perf_counter()
+    nf.fit(df)
+    seconds = time.perf_counter() - start
+    # the fitted model is a copy, and so is its timer
+    timer = nf.models[0].trainer_kwargs["callbacks"][0]
+    return seconds, timer.steps_per_second(max_steps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=200)
+    parser.add_argument("--warmup_steps", type=int, default=20)
+    args = parser.parse_args()
+
+    df = generate_series(n_series=32, min_length=500, max_length=500)
+    results = []
+    for name in MODELS:
+        eager_s, eager_steps_s = fit(
+            df, name, False, args.max_steps, args.warmup_steps
+        )
+        compiled_s, compiled_steps_s = fit(
+            df, name, True, args.max_steps, args.warmup_steps
+        )
+        results.append(
+            dict(
+                model=name,
+                eager_steps_s=eager_steps_s,
+                compiled_steps_s=compiled_steps_s,
+                eager_fit_s=eager_s,
+                compiled_fit_s=compiled_s,
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
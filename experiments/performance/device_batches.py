@@ -0,0 +1,59 @@
+"""Training time with the batches sampled on the device.
+
+Fits a small NHITS on synthetic panels of increasing size, drawing the training
+batches either through the `TimeSeriesLoader` or from a copy of the padded series
+kept on the training device (`device_batches=True`).
+"""
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import NHITS
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+
+def fit_time(df, device_batches, max_steps, accelerator):
+    model = NHITS(
+        h=12,
+        input_size=48,
+        max_steps=max_steps,
+        batch_size=64,
+        windows_batch_size=128,
+        mlp_units=3 * [[64, 64]],
+        val_check_steps=max_steps,
+        device_batches=device_batches,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+        accelerator=accelerator,
+    )
+    nf = NeuralForecast(models=[model], freq="D")
+    start = time.perf_counter()
+    nf.fit(df)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=300)
+    parser.add_argument("--accelerator", default="cpu")
+    args = parser.parse_args()
+
+    results = []
+    for n_series in (100, 1_000, 5_000):
+        df = generate_series(n_series=n_series, min_length=100, max_length=500)
+        loader_s = fit_time(df, False, args.max_steps, args.accelerator)
+        device_s = fit_time(df, True, args.max_steps, args.accelerator)
+        results.append(
+            dict(
+                n_series=n_series,
+                loader_steps_s=args.max_steps / loader_s,
+                device_steps_s=args.max_steps / device_s,
+            )
+        )
+    print(pd.DataFrame(results).round(1).to_string(index=False))
@@ -0,0 +1,76 @@
+"""Peak memory of `TimeSeriesDataset.from_df` for pandas and polars frames.
+
+Each measurement runs in a fresh process. We report the peak of the numpy
+allocations traced by `tracemalloc` while building the dataset, relative to the
+size of the final `temporal` block. Allocations made by torch are not traced.
+"""
+import argparse
+import multiprocessing as mp
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def make_panel(n_series, n_features, min_length, max_length, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(min_length, max_length + 1, size=n_series)
+    n_rows = sizes.sum()
+    df = pd.DataFrame(
+        {
+            "unique_id": np.repeat(np.arange(n_series), sizes),
+            "ds": np.hstack([np.arange(size) for size in sizes]),
+            "y": rng.random(n_rows),
+        }
+    )
+    for i in range(n_features):
+        df[f"temporal_{i}"] = rng.random(n_rows)
+    # shuffle so that from_df has to sort
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def measure(engine, args, queue):
+    from neuralforecast.tsdataset import TimeSeriesDataset
+
+    df = make_panel(args.n_series, args.n_features, args.min_length, args.max_length)
+    if engine == "polars":
+        import polars
+
+        df = polars.from_pandas(df)
+    tracemalloc.start()
+    start = time.perf_counter()
+    dataset, *_ = TimeSeriesDataset.from_df(df=df, sort_df=True)
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    block = dataset.temporal.numpy().nbytes
+    queue.put(
+        dict(
+            engine=engine,
+            rows=dataset.temporal.shape[0],
+            block_mb=block / 2**20,
+            traced_peak_mb=traced_peak / 2**20,
+            traced_peak_ratio=traced_peak / block,
+            seconds=elapsed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=10_000)
+    parser.add_argument("--n_features", type=int, default=10)
+    parser.add_argument("--min_length", type=int, default=100)
+    parser.add_argument("--max_length", type=int, default=500)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for engine in ("pandas", "polars"):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=measure, args=(engine, args, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+    print(pd.DataFrame(results).round(2).to_string(index=False))
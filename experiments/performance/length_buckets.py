@@ -0,0 +1,78 @@
+"""Bytes moved per training step with and without length bucketed batches.
+
+The panel mixes a few long series with many short ones. Without buckets every
+series is padded to the longest series of the panel, with buckets only to the
+longest series of its batch. The script reports the size of the temporal batch
+built by the loader and the runtime of a short NHITS training.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from neuralforecast.models import NHITS
+from neuralforecast.tsdataset import TimeSeriesDataModule, TimeSeriesDataset
+from neuralforecast.utils import generate_series
+
+INPUT_SIZE = 48
+
+
+def ragged_panel(n_series, n_long, short_length, long_length):
+    df = generate_series(n_series=n_series, min_length=long_length, max_length=long_length)
+    lengths = np.where(np.arange(n_series) < n_long, long_length, short_length)
+    position = df.groupby("unique_id", observed=True).cumcount(ascending=False)
+    return df[position < lengths[df["unique_id"].cat.codes]].reset_index(drop=True)
+
+
+def loader_bytes(dataset, batch_size, bucket_by_length):
+    # NHITS pads the buckets with input_size - 1 timestamps
+    loader = TimeSeriesDataModule(
+        dataset=dataset,
+        batch_size=batch_size,
+        bucket_by_length=bucket_by_length,
+        bucket_padding=INPUT_SIZE - 1,
+    ).train_dataloader()
+    return np.mean([batch["temporal"].nbytes for batch in loader])
+
+
+def fit_time(df, bucket_by_length, max_steps):
+    model = NHITS(
+        h=12,
+        input_size=INPUT_SIZE,
+        max_steps=max_steps,
+        batch_size=32,
+        bucket_by_length=bucket_by_length,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+        accelerator="cpu",
+    )
+    dataset, *_ = TimeSeriesDataset.from_df(df)
+    start = time.perf_counter()
+    model.fit(dataset)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=2_000)
+    parser.add_argument("--n_long", type=int, default=20)
+    parser.add_argument("--short_length", type=int, default=100)
+    parser.add_argument("--long_length", type=int, default=5_000)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--max_steps", type=int, default=100)
+    args = parser.parse_args()
+
+    df = ragged_panel(args.n_series, args.n_long, args.short_length, args.long_length)
+    dataset, *_ = TimeSeriesDataset.from_df(df)
+    results = []
+    for bucket_by_length in (False, True):
+        results.append(
+            dict(
+                bucket_by_length=bucket_by_length,
+                batch_mb=loader_bytes(dataset, args.batch_size, bucket_by_length) / 2**20,
+                fit_s=fit_time(df, bucket_by_length, args.max_steps),
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,68 @@
+"""Time per training step of small models with the trainer and the lightweight loop.
+
+Fits small models with PyTorch Lightning's `Trainer`, with its default progress bar
+and logger and without them, and with `lightweight_trainer=True`. The time per step
+is the fit time divided by the number of steps, so it includes the fixed costs of
+setting up each fit.
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+import pandas as pd
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import MLP, NHITS, DLinear, NLinear
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+MODELS = {
+    "MLP": (MLP, dict(num_layers=2, hidden_size=64)),
+    "NLinear": (NLinear, dict()),
+    "DLinear": (DLinear, dict()),
+    "NHITS": (NHITS, dict(mlp_units=3 * [[64, 64]])),
+}
+
+TRAINERS = {
+    "trainer": dict(),
+    "trainer_quiet": dict(enable_progress_bar=False, logger=False),
+    "lightweight": dict(lightweight_trainer=True),
+}
+
+
+def fit(df, name, trainer_kwargs, max_steps):
+    model_cls, kwargs = MODELS[name]
+    model = model_cls(
+        h=12,
+        input_size=24,
+        max_steps=max_steps,
+        val_check_steps=100,
+        enable_model_summary=False,
+        **trainer_kwargs,
+        **kwargs,
+    )
+    nf = NeuralForecast(models=[model], freq="D")
+    start = time.perf_counter()
+    nf.fit(df, val_size=12)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=1_000)
+    args = parser.parse_args()
+
+    df = generate_series(n_series=8, min_length=200, max_length=200)
+    results = []
+    # the default logger writes to the working directory
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in MODELS:
+            row = dict(model=name)
+            for trainer, trainer_kwargs in TRAINERS.items():
+                trainer_kwargs = dict(default_root_dir=tmpdir, **trainer_kwargs)
+                seconds = fit(df, name, trainer_kwargs, args.max_steps)
+                row[f"{trainer}_ms"] = 1_000 * seconds / args.max_steps
+            results.append(row)
+    print(pd.DataFrame(results).round(3).to_string(index=False))
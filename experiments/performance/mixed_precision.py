@@ -0,0 +1,68 @@
+"""Training throughput and forecasts with bf16 mixed precision.
+
+Fits models of the different base classes in float32 and with `precision='bf16-mixed'`,
+which autocasts their forward passes while the scalers and losses stay in float32,
+and compares the steps per second and the forecasts of both fits.
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import LSTM, NHITS, TFT, PatchTST, TSMixer
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+MODELS = {
+    "NHITS": (NHITS, dict(mlp_units=3 * [[512, 512]], windows_batch_size=256)),
+    "PatchTST": (PatchTST, dict(hidden_size=128, windows_batch_size=256)),
+    "TFT": (TFT, dict(hidden_size=128, windows_batch_size=256)),
+    "LSTM": (LSTM, dict(encoder_hidden_size=256, decoder_hidden_size=256)),
+    "TSMixer": (TSMixer, dict(n_series=32, ff_dim=256, batch_size=64)),
+}
+
+
+def fit_predict(df, name, precision, max_steps):
+    model_cls, kwargs = MODELS[name]
+    model = model_cls(
+        h=24,
+        input_size=96,
+        max_steps=max_steps,
+        val_check_steps=max_steps,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+        precision=precision,
+        **kwargs,
+    )
+    nf = NeuralForecast(models=[model], freq="D")
+    start = time.perf_counter()
+    nf.fit(df)
+    seconds = time.perf_counter() - start
+    return seconds, nf.predict()[name].to_numpy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=100)
+    args = parser.parse_args()
+
+    df = generate_series(n_series=32, min_length=500, max_length=500)
+    results = []
+    for name in MODELS:
+        fp32_s, fp32_fcst = fit_predict(df, name, "32-true", args.max_steps)
+        bf16_s, bf16_fcst = fit_predict(df, name, "bf16-mixed", args.max_steps)
+        results.append(
+            dict(
+                model=name,
+                fp32_steps_s=args.max_steps / fp32_s,
+                bf16_steps_s=args.max_steps / bf16_s,
+                fcst_rel_diff=np.abs(bf16_fcst - fp32_fcst).mean()
+                / np.abs(fp32_fcst).mean(),
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,66 @@
+"""Runtime and peak memory of the predict windows of `BaseMultivariate`.
+
+Predicts every window (step 1) of the last `test_size` timestamps of a panel with
+`TSMixer`, forecasting all the windows at once or by chunks of windows. Each
+configuration runs in its own process, so the peak resident memory is its own.
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+import pandas as pd
+
+from neuralforecast.losses.pytorch import MAE
+from neuralforecast.models import TSMixer
+from neuralforecast.tsdataset import TimeSeriesDataset
+from neuralforecast.utils import generate_series
+
+
+def run(n_series, test_size, inference_windows_batch_size):
+    df = generate_series(
+        n_series=n_series, min_length=test_size + 200, max_length=test_size + 200
+    )
+    dataset, *_ = TimeSeriesDataset.from_df(df)
+    model = TSMixer(
+        h=24,
+        input_size=96,
+        n_series=n_series,
+        loss=MAE(),
+        valid_loss=MAE(),
+        max_steps=1,
+        inference_windows_batch_size=inference_windows_batch_size,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+    )
+    model.fit(dataset)
+    model.set_test_size(test_size)
+    start = time.perf_counter()
+    model.predict(dataset)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on linux
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=64)
+    parser.add_argument("--test_size", type=int, default=4_000)
+    args = parser.parse_args()
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for inference_windows_batch_size in (-1, 1024, 256):
+        with ctx.Pool(1) as pool:
+            seconds, peak_mb = pool.apply(
+                run, (args.n_series, args.test_size, inference_windows_batch_size)
+            )
+        results.append(
+            dict(
+                inference_windows_batch_size=inference_windows_batch_size,
+                predict_s=seconds,
+                peak_mb=peak_mb,
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
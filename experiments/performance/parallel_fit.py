@@ -0,0 +1,72 @@
+"""Wall time of fitting and predicting an ensemble sequentially and in parallel processes.
+
+Fits six models with `NeuralForecast(n_jobs=1)` and with `n_jobs` processes of
+`threads_per_job` threads each, and predicts with them. The parallel runs include
+starting the processes, which import the library again.
+"""
+import argparse
+import logging
+import time
+
+import pandas as pd
+import torch
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import MLP, NBEATS, NHITS, TCN, DLinear, NLinear
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+
+def get_models(max_steps):
+    kwargs = dict(
+        h=24,
+        input_size=96,
+        max_steps=max_steps,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        logger=False,
+    )
+    return [
+        MLP(**kwargs),
+        NHITS(**kwargs),
+        NBEATS(**kwargs),
+        DLinear(**kwargs),
+        NLinear(**kwargs),
+        TCN(**kwargs),
+    ]
+
+
+def fit_predict(df, n_jobs, threads_per_job, max_steps):
+    nf = NeuralForecast(
+        models=get_models(max_steps),
+        freq="D",
+        n_jobs=n_jobs,
+        threads_per_job=threads_per_job,
+    )
+    start = time.perf_counter()
+    nf.fit(df)
+    fit_s = time.perf_counter() - start
+    start = time.perf_counter()
+    nf.predict()
+    return fit_s, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=200)
+    parser.add_argument("--n_jobs", type=int, default=6)
+    args = parser.parse_args()
+
+    df = generate_series(n_series=256, min_length=1_000, max_length=1_000)
+    n_threads = torch.get_num_threads()
+    threads_per_job = max(1, n_threads // args.n_jobs)
+    results = []
+    for n_jobs, threads in [(1, n_threads), (args.n_jobs, threads_per_job)]:
+        fit_s, predict_s = fit_predict(df, n_jobs, threads, args.max_steps)
+        results.append(
+            dict(
+                n_jobs=n_jobs, threads_per_job=threads, fit_s=fit_s, predict_s=predict_s
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
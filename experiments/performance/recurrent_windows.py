@@ -0,0 +1,101 @@
+"""Runtime and memory of creating the training windows of `BaseRecurrent`.
+
+The padded version pads the whole history of the batch, unfolds it and samples
+the truncated sequence from the windows, copying the targets of every timestamp.
+The sliced version samples the span of the truncated sequence first and only
+pads the horizon past the end of the series.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from neuralforecast.common._base_recurrent import BaseRecurrent
+from neuralforecast.losses.pytorch import MAE
+from neuralforecast.tsdataset import TimeSeriesDataset
+from neuralforecast.utils import generate_series
+
+
+def padded_windows(model, batch):
+    temporal = model.padder(batch["temporal"])
+    windows = temporal.unfold(dimension=-1, size=1 + model.h, step=1)
+    start = np.random.choice(windows.shape[2] - model.input_size + 1)
+    windows = windows[:, :, start : start + model.input_size]
+    outsample_y = windows[:, batch["y_idx"], :, -model.h :].contiguous()
+    return temporal, outsample_y
+
+
+def sliced_windows(model, batch):
+    windows = model._create_windows(batch, step="train")
+    outsample_y = windows["temporal"][:, batch["y_idx"], :, -model.h :]
+    return windows["temporal"], outsample_y
+
+
+def copied_mb(fn, model, batch):
+    # the storages that are allocated on top of the batch
+    storages = {
+        t.untyped_storage().data_ptr(): t.untyped_storage().nbytes()
+        for t in fn(model, batch)
+    }
+    storages.pop(batch["temporal"].untyped_storage().data_ptr(), None)
+    return sum(storages.values()) / 2**20
+
+
+def measure(fn, model, batch, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(model, batch)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--h", type=int, default=90)
+    parser.add_argument("--input_size", type=int, default=180)
+    parser.add_argument("--n_features", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    model = BaseRecurrent(
+        h=args.h,
+        input_size=args.input_size,
+        inference_input_size=args.input_size,
+        loss=MAE(),
+        valid_loss=MAE(),
+        learning_rate=1e-3,
+        max_steps=1,
+        val_check_steps=0,
+        batch_size=args.batch_size,
+        valid_batch_size=args.batch_size,
+    )
+    results = []
+    for length in (1_000, 5_000, 20_000):
+        df = generate_series(
+            n_series=args.batch_size,
+            min_length=length,
+            max_length=length,
+            n_temporal_features=args.n_features,
+        )
+        for col in df.columns[df.columns.str.startswith("temporal")]:
+            df[col] = df[col].cat.codes
+        dataset, *_ = TimeSeriesDataset.from_df(df)
+        batch = dataset.__getitems__(list(range(len(dataset))))
+        batch.update(
+            temporal_cols=dataset.temporal_cols,
+            static_cols=dataset.static_cols,
+            y_idx=dataset.y_idx,
+        )
+        results.append(
+            dict(
+                length=length,
+                padded_mb=copied_mb(padded_windows, model, batch),
+                sliced_mb=copied_mb(sliced_windows, model, batch),
+                padded_s=measure(padded_windows, model, batch, args.repeats),
+                sliced_s=measure(sliced_windows, model, batch, args.repeats),
+            )
+        )
+    print(pd.DataFrame(results).round(4).to_string(index=False))
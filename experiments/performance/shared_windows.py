@@ -0,0 +1,62 @@
+"""Fit time of an ensemble of light models with and without shared training windows.
+
+Fits four windows-based models with the same windows settings and the lightweight
+training loop, separately and with `NeuralForecast(share_windows=True)`, which creates
+and normalizes the training windows of each step once for the four of them.
+"""
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import MLP, NHITS, DLinear, NLinear
+from neuralforecast.utils import generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+
+def get_models(max_steps):
+    kwargs = dict(
+        h=24,
+        input_size=96,
+        max_steps=max_steps,
+        scaler_type="robust",
+        windows_batch_size=1024,
+        lightweight_trainer=True,
+    )
+    return [
+        MLP(num_layers=2, hidden_size=64, **kwargs),
+        NHITS(mlp_units=3 * [[64, 64]], **kwargs),
+        DLinear(**kwargs),
+        NLinear(**kwargs),
+    ]
+
+
+def fit(df, share_windows, max_steps):
+    nf = NeuralForecast(
+        models=get_models(max_steps), freq="D", share_windows=share_windows
+    )
+    start = time.perf_counter()
+    nf.fit(df)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max_steps", type=int, default=500)
+    args = parser.parse_args()
+
+    df = generate_series(n_series=32, min_length=1_000, max_length=1_000)
+    results = []
+    for share_windows in [False, True]:
+        seconds = fit(df, share_windows, args.max_steps)
+        results.append(
+            dict(
+                share_windows=share_windows,
+                fit_s=seconds,
+                ms_per_step=1_000 * seconds / args.max_steps,
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
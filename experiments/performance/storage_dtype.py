@@ -0,0 +1,81 @@
+"""Memory and accuracy of storing the temporal data in reduced precision.
+
+Fits NHITS on the AirPassengers panel and on a synthetic panel with each
+`storage_dtype` and reports the size of the stored temporal data, the test MAE
+and the mean absolute difference of the forecasts relative to float32.
+"""
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from neuralforecast import NeuralForecast
+from neuralforecast.models import NHITS
+from neuralforecast.utils import AirPassengersPanel, generate_series
+
+logging.getLogger("pytorch_lightning").setLevel(logging.ERROR)
+
+H = 12
+
+
+def train_test(df):
+    test = df.groupby("unique_id", observed=True).tail(H)
+    return df.drop(test.index), test
+
+
+def evaluate(df, freq, max_steps):
+    train, test = train_test(df)
+    results = []
+    for storage_dtype in ("float32", "float16", "bfloat16"):
+        nf = NeuralForecast(
+            models=[
+                NHITS(
+                    h=H,
+                    input_size=2 * H,
+                    max_steps=max_steps,
+                    random_seed=1,
+                    enable_progress_bar=False,
+                    enable_model_summary=False,
+                    logger=False,
+                    accelerator="cpu",
+                )
+            ],
+            freq=freq,
+            local_scaler_type="standard",
+            storage_dtype=storage_dtype,
+        )
+        nf.fit(train)
+        fcst = nf.predict()["NHITS"].to_numpy()
+        results.append(
+            dict(
+                storage_dtype=storage_dtype,
+                temporal_mb=nf.dataset.temporal.nbytes / 2**20,
+                mae=np.abs(fcst - test["y"].to_numpy()).mean(),
+                fcst=fcst,
+            )
+        )
+    reference = results[0]["fcst"]
+    for res in results:
+        fcst = res.pop("fcst")
+        res["rel_diff"] = np.abs(fcst - reference).mean() / np.abs(reference).mean()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=1_000)
+    parser.add_argument("--max_steps", type=int, default=200)
+    args = parser.parse_args()
+
+    synthetic = generate_series(
+        n_series=args.n_series, min_length=200, max_length=500, n_static_features=0
+    )
+    results = []
+    for name, df, freq in (
+        ("AirPassengers", AirPassengersPanel[["unique_id", "ds", "y"]], "M"),
+        ("generate_series", synthetic, "D"),
+    ):
+        for res in evaluate(df, freq, args.max_steps):
+            results.append(dict(data=name, **res))
+    print(pd.DataFrame(results).round(4).to_string(index=False))
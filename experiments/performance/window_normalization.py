@@ -0,0 +1,88 @@
+"""Runtime of normalizing the inference windows of `BaseWindows`.
+
+Normalizes every window of a batch of series with step 1, first reducing each
+window with `TemporalNorm` and then with the statistics that `_create_windows`
+computes from the prefix sums (standard) or the block extremes (minmax) of each
+serie.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from neuralforecast.common._base_windows import BaseWindows
+from neuralforecast.losses.pytorch import MAE
+from neuralforecast.tsdataset import TimeSeriesDataset
+from neuralforecast.utils import generate_series
+
+
+def normalize(model, batch):
+    windows = model._create_windows(batch, step="predict")
+    return model._normalization(windows, y_idx=0)
+
+
+def measure(fn, model, batch, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(model, batch)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_series", type=int, default=32)
+    parser.add_argument("--length", type=int, default=2_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    df = generate_series(
+        n_series=args.n_series,
+        min_length=args.length,
+        max_length=args.length,
+        n_temporal_features=4,
+    )
+    for col in df.columns[df.columns.str.startswith("temporal")]:
+        df[col] = df[col].cat.codes
+    dataset, *_ = TimeSeriesDataset.from_df(df)
+    batch = dataset.__getitems__(list(range(len(dataset))))
+    batch.update(temporal_cols=dataset.temporal_cols, static_cols=None, y_idx=0)
+
+    results = []
+    for scaler_type in ("standard", "minmax"):
+        for input_size in (24, 96, 384):
+            models = [
+                BaseWindows(
+                    h=24,
+                    input_size=input_size,
+                    hist_exog_list=[f"temporal_{i}" for i in range(4)],
+                    loss=MAE(),
+                    valid_loss=MAE(),
+                    learning_rate=1e-3,
+                    max_steps=1,
+                    val_check_steps=0,
+                    batch_size=args.n_series,
+                    valid_batch_size=args.n_series,
+                    windows_batch_size=1024,
+                    inference_windows_batch_size=-1,
+                    scaler_type=scaler_type,
+                    start_padding_enabled=False,
+                )
+                for _ in range(2)
+            ]
+            # the first model reduces every window
+            models[0].scaler.compute_window_statistics = None
+            for model in models:
+                model.test_size = args.length - input_size
+                model.predict_step_size = 1
+            results.append(
+                dict(
+                    scaler_type=scaler_type,
+                    input_size=input_size,
+                    per_window_s=measure(normalize, models[0], batch, args.repeats),
+                    from_series_s=measure(normalize, models[1], batch, args.repeats),
+                )
+            )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
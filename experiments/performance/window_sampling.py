@@ -0,0 +1,114 @@
+"""Runtime and memory of sampling the training windows of `BaseWindows`.
+
+The unfolded version materializes every window of the batch, and repeats the
+static features for each of them, before sampling `windows_batch_size` of them.
+The indexed version finds the available windows from the prefix sums of the mask
+and gathers only the sampled windows and the static features of their series.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from neuralforecast.common._base_windows import BaseWindows
+from neuralforecast.losses.pytorch import MAE
+from neuralforecast.tsdataset import TimeSeriesDataset
+from neuralforecast.utils import generate_series
+
+
+def unfolded_windows(model, batch):
+    window_size = model.input_size + model.h
+    temporal = model.padder_train(batch["temporal"])
+    windows = temporal.unfold(dimension=-1, size=window_size, step=model.step_size)
+    windows = windows.permute(0, 2, 3, 1).contiguous()
+    windows = windows.reshape(-1, window_size, temporal.shape[1])
+    static = torch.repeat_interleave(
+        batch["static"], repeats=len(windows) // len(batch["static"]), dim=0
+    )
+    available_idx = batch["temporal_cols"].get_loc("available_mask")
+    final_condition = (windows[:, : model.input_size, available_idx].sum(axis=1) > 0) & (
+        windows[:, model.input_size :, available_idx].sum(axis=1) > 0
+    )
+    windows = windows[final_condition]
+    static = static[final_condition]
+    w_idxs = np.random.choice(
+        len(windows),
+        size=model.windows_batch_size,
+        replace=(len(windows) < model.windows_batch_size),
+    )
+    return windows[w_idxs], static[w_idxs]
+
+
+def indexed_windows(model, batch):
+    windows = model._create_windows(batch, step="train")
+    return windows["temporal"], windows["static"]
+
+
+def measure(fn, model, batch, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(model, batch)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--input_size", type=int, default=96)
+    parser.add_argument("--n_features", type=int, default=4)
+    parser.add_argument("--n_static", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    model = BaseWindows(
+        h=24,
+        input_size=args.input_size,
+        loss=MAE(),
+        valid_loss=MAE(),
+        learning_rate=1e-3,
+        max_steps=1,
+        val_check_steps=0,
+        batch_size=args.batch_size,
+        valid_batch_size=args.batch_size,
+        windows_batch_size=1024,
+        inference_windows_batch_size=1024,
+        start_padding_enabled=False,
+    )
+    results = []
+    for length in (500, 2_000, 10_000):
+        df, static_df = generate_series(
+            n_series=args.batch_size,
+            min_length=length,
+            max_length=length,
+            n_temporal_features=args.n_features,
+            n_static_features=args.n_static,
+        )
+        for col in df.columns[df.columns.str.startswith("temporal")]:
+            df[col] = df[col].cat.codes
+        dataset, *_ = TimeSeriesDataset.from_df(df, static_df=static_df)
+        batch = dataset.__getitems__(list(range(len(dataset))))
+        batch.update(
+            temporal_cols=dataset.temporal_cols,
+            static_cols=dataset.static_cols,
+            y_idx=dataset.y_idx,
+        )
+        # the largest tensors of each version hold its windows and static features
+        window_bytes = (
+            (model.input_size + model.h) * batch["temporal"].shape[1]
+            + batch["static"].shape[1]
+        ) * 4
+        n_windows = args.batch_size * (length - model.input_size - model.h + 1)
+        results.append(
+            dict(
+                length=length,
+                unfolded_mb=n_windows * window_bytes / 2**20,
+                indexed_mb=model.windows_batch_size * window_bytes / 2**20,
+                unfolded_s=measure(unfolded_windows, model, batch, args.repeats),
+                indexed_s=measure(indexed_windows, model, batch, args.repeats),
+            )
+        )
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -135,8 +135,16 @@ d = { 'settings': { 'branch': 'main',
                                                                                       'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast._check_nan': ( 'core.html#neuralforecast._check_nan',
                                                                                         'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._fit_predict_models': ( 'core.html#neuralforecast._fit_predict_models',
+                                                                                                 'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._get_max_lookback': ( 'core.html#neuralforecast._get_max_lookback',
+                                                                                               'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._get_needed_exog': ( 'core.html#neuralforecast._get_needed_exog',
+                                                                                              'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast._get_needed_futr_exog': ( 'core.html#neuralforecast._get_needed_futr_exog',
                                                                                                    'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._model_groups': ( 'core.html#neuralforecast._model_groups',
+                                                                                           'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast._no_refit_cross_validation': ( 'core.html#neuralforecast._no_refit_cross_validation',
                                                                                                         'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast._prepare_fit': ( 'core.html#neuralforecast._prepare_fit',
@@ -149,6 +157,10 @@ d = { 'settings': { 'branch': 'main',
                                                                                                                'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast._scalers_transform': ( 'core.html#neuralforecast._scalers_transform',
                                                                                                 'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._trim_history': ( 'core.html#neuralforecast._trim_history',
+                                                                                           'neuralforecast/core.py'),
+                                     'neuralforecast.core.NeuralForecast._ungroup_results': ( 'core.html#neuralforecast._ungroup_results',
+                                                                                              'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast.cross_validation': ( 'core.html#neuralforecast.cross_validation',
                                                                                               'neuralforecast/core.py'),
                                      'neuralforecast.core.NeuralForecast.fit': ('core.html#neuralforecast.fit', 'neuralforecast/core.py'),
@@ -1184,10 +1196,34 @@ d = { 'settings': { 'branch': 'main',
                                                                                                                                     'neuralforecast/models/vanillatransformer.py'),
                                                           'neuralforecast.models.vanillatransformer.VanillaTransformer.forward': ( 'models.vanillatransformer.html#vanillatransformer.forward',
                                                                                                                                    'neuralforecast/models/vanillatransformer.py')},
-            'neuralforecast.tsdataset': { 'neuralforecast.tsdataset.TimeSeriesDataModule': ( 'tsdataset.html#timeseriesdatamodule',
+            'neuralforecast.tsdataset': { 'neuralforecast.tsdataset.MemmapTimeSeriesDataset': ( 'tsdataset.html#memmaptimeseriesdataset',
+                                                                                                'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.__getstate__': ( 'tsdataset.html#memmaptimeseriesdataset.__getstate__',
+                                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.__init__': ( 'tsdataset.html#memmaptimeseriesdataset.__init__',
+                                                                                                         'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.__repr__': ( 'tsdataset.html#memmaptimeseriesdataset.__repr__',
+                                                                                                         'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.__setstate__': ( 'tsdataset.html#memmaptimeseriesdataset.__setstate__',
+                                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset._allocate_temporal': ( 'tsdataset.html#memmaptimeseriesdataset._allocate_temporal',
+                                                                                                                   'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset._share_memory': ( 'tsdataset.html#memmaptimeseriesdataset._share_memory',
+                                                                                                              'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset._write': ( 'tsdataset.html#memmaptimeseriesdataset._write',
+                                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.from_df': ( 'tsdataset.html#memmaptimeseriesdataset.from_df',
+                                                                                                        'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.MemmapTimeSeriesDataset.from_parquet': ( 'tsdataset.html#memmaptimeseriesdataset.from_parquet',
+                                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataModule': ( 'tsdataset.html#timeseriesdatamodule',
                                                                                              'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataModule.__init__': ( 'tsdataset.html#timeseriesdatamodule.__init__',
                                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataModule._series_subset_loader': ( 'tsdataset.html#timeseriesdatamodule._series_subset_loader',
+                                                                                                                   'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataModule.on_after_batch_transfer': ( 'tsdataset.html#timeseriesdatamodule.on_after_batch_transfer',
+                                                                                                                     'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataModule.predict_dataloader': ( 'tsdataset.html#timeseriesdatamodule.predict_dataloader',
                                                                                                                 'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataModule.train_dataloader': ( 'tsdataset.html#timeseriesdatamodule.train_dataloader',
@@ -1200,16 +1236,38 @@ d = { 'settings': { 'branch': 'main',
                                                                                                  'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.__getitem__': ( 'tsdataset.html#timeseriesdataset.__getitem__',
                                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset.__getitems__': ( 'tsdataset.html#timeseriesdataset.__getitems__',
+                                                                                                       'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.__init__': ( 'tsdataset.html#timeseriesdataset.__init__',
                                                                                                    'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.__len__': ( 'tsdataset.html#timeseriesdataset.__len__',
                                                                                                   'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.__repr__': ( 'tsdataset.html#timeseriesdataset.__repr__',
                                                                                                    'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._allocate_temporal': ( 'tsdataset.html#timeseriesdataset._allocate_temporal',
+                                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._gather': ( 'tsdataset.html#timeseriesdataset._gather',
+                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._get_item': ( 'tsdataset.html#timeseriesdataset._get_item',
+                                                                                                    'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._get_items': ( 'tsdataset.html#timeseriesdataset._get_items',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._keep_last': ( 'tsdataset.html#timeseriesdataset._keep_last',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._mask_values': ( 'tsdataset.html#timeseriesdataset._mask_values',
+                                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._set_dtype': ( 'tsdataset.html#timeseriesdataset._set_dtype',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._share_memory': ( 'tsdataset.html#timeseriesdataset._share_memory',
+                                                                                                        'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset._unpacked_mask': ( 'tsdataset.html#timeseriesdataset._unpacked_mask',
+                                                                                                         'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.align': ( 'tsdataset.html#timeseriesdataset.align',
                                                                                                 'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.append': ( 'tsdataset.html#timeseriesdataset.append',
                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset.TimeSeriesDataset.append_view': ( 'tsdataset.html#timeseriesdataset.append_view',
+                                                                                                      'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.from_df': ( 'tsdataset.html#timeseriesdataset.from_df',
                                                                                                   'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesDataset.trim_dataset': ( 'tsdataset.html#timeseriesdataset.trim_dataset',
@@ -1221,7 +1279,81 @@ d = { 'settings': { 'branch': 'main',
                                           'neuralforecast.tsdataset.TimeSeriesLoader.__init__': ( 'tsdataset.html#timeseriesloader.__init__',
                                                                                                   'neuralforecast/tsdataset.py'),
                                           'neuralforecast.tsdataset.TimeSeriesLoader._collate_fn': ( 'tsdataset.html#timeseriesloader._collate_fn',
-                                                                                                     'neuralforecast/tsdataset.py')},
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset': ( 'tsdataset.html#_appendeddataset',
+                                                                                         'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset.__init__': ( 'tsdataset.html#_appendeddataset.__init__',
+                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset.__repr__': ( 'tsdataset.html#_appendeddataset.__repr__',
+                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset._get_item': ( 'tsdataset.html#_appendeddataset._get_item',
+                                                                                                   'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset._get_items': ( 'tsdataset.html#_appendeddataset._get_items',
+                                                                                                    'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset._materialize': ( 'tsdataset.html#_appendeddataset._materialize',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset._share_memory': ( 'tsdataset.html#_appendeddataset._share_memory',
+                                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset.available_mask': ( 'tsdataset.html#_appendeddataset.available_mask',
+                                                                                                        'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._AppendedDataset.temporal': ( 'tsdataset.html#_appendeddataset.temporal',
+                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._BucketedDataset': ( 'tsdataset.html#_bucketeddataset',
+                                                                                         'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._BucketedDataset.__getitem__': ( 'tsdataset.html#_bucketeddataset.__getitem__',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._BucketedDataset.__getitems__': ( 'tsdataset.html#_bucketeddataset.__getitems__',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._BucketedDataset.__init__': ( 'tsdataset.html#_bucketeddataset.__init__',
+                                                                                                  'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._BucketedDataset.__len__': ( 'tsdataset.html#_bucketeddataset.__len__',
+                                                                                                 'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._DeviceBatches': ( 'tsdataset.html#_devicebatches',
+                                                                                       'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._DeviceBatches.__init__': ( 'tsdataset.html#_devicebatches.__init__',
+                                                                                                'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._DeviceBatches.__iter__': ( 'tsdataset.html#_devicebatches.__iter__',
+                                                                                                'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._DeviceBatches.__len__': ( 'tsdataset.html#_devicebatches.__len__',
+                                                                                               'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._LengthBucketSampler': ( 'tsdataset.html#_lengthbucketsampler',
+                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._LengthBucketSampler.__init__': ( 'tsdataset.html#_lengthbucketsampler.__init__',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._LengthBucketSampler.__iter__': ( 'tsdataset.html#_lengthbucketsampler.__iter__',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._LengthBucketSampler.__len__': ( 'tsdataset.html#_lengthbucketsampler.__len__',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions': ( 'tsdataset.html#_partitions',
+                                                                                    'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions.__init__': ( 'tsdataset.html#_partitions.__init__',
+                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions._read': ( 'tsdataset.html#_partitions._read',
+                                                                                          'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions._scatter': ( 'tsdataset.html#_partitions._scatter',
+                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions._set_columns': ( 'tsdataset.html#_partitions._set_columns',
+                                                                                                 'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions.to_float32_block': ( 'tsdataset.html#_partitions.to_float32_block',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._Partitions.to_mask': ( 'tsdataset.html#_partitions.to_mask',
+                                                                                            'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._SeriesSubsetSampler': ( 'tsdataset.html#_seriessubsetsampler',
+                                                                                             'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._SeriesSubsetSampler.__init__': ( 'tsdataset.html#_seriessubsetsampler.__init__',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._SeriesSubsetSampler.__iter__': ( 'tsdataset.html#_seriessubsetsampler.__iter__',
+                                                                                                      'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._SeriesSubsetSampler.__len__': ( 'tsdataset.html#_seriessubsetsampler.__len__',
+                                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._pack_mask': ( 'tsdataset.html#_pack_mask',
+                                                                                   'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._to_float32_block': ( 'tsdataset.html#_to_float32_block',
+                                                                                          'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._unpack_mask': ( 'tsdataset.html#_unpack_mask',
+                                                                                     'neuralforecast/tsdataset.py'),
+                                          'neuralforecast.tsdataset._value_cols': ( 'tsdataset.html#_value_cols',
+                                                                                    'neuralforecast/tsdataset.py')},
             'neuralforecast.utils': { 'neuralforecast.utils.DayOfMonth': ('utils.html#dayofmonth', 'neuralforecast/utils.py'),
                                       'neuralforecast.utils.DayOfMonth.__call__': ( 'utils.html#dayofmonth.__call__',
                                                                                     'neuralforecast/utils.py'),
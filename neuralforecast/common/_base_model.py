@@ -7,16 +7,214 @@ __all__ = ['BaseModel']
 import inspect
 import random
 import warnings
-from copy import deepcopy
+from copy import copy, deepcopy
 
+import fsspec
 import numpy as np
 import torch
 import pytorch_lightning as pl
 from pytorch_lightning.callbacks.early_stopping import EarlyStopping
 
 from ..tsdataset import TimeSeriesDataModule
+from ..utils import get_indexer_raise_missing
 
 # %% ../../nbs/common.base_model.ipynb 3
+class _BatchSchema:
+    """Positions of the columns that a model reads from the batches of a dataset.
+
+    Resolved from the column names once per `fit` and `predict`, so the steps index
+    the batches with these tensors instead of looking up the pandas Indexes."""
+
+    def __init__(
+        self,
+        temporal_cols,
+        static_cols,
+        y_idx,
+        hist_exog_list,
+        futr_exog_list,
+        stat_exog_list,
+    ):
+        self.temporal_cols = temporal_cols
+        self.static_cols = static_cols
+        self.y_idx = y_idx
+        self.mask_idx = temporal_cols.get_loc("available_mask")
+        self.hist_exog_idx = self._get_indexer(temporal_cols, hist_exog_list)
+        self.futr_exog_idx = self._get_indexer(temporal_cols, futr_exog_list)
+        self.stat_exog_idx = self._get_indexer(static_cols, stat_exog_list)
+        # The target and the exogenous variables normalized with it
+        exog_cols = set(hist_exog_list + futr_exog_list)
+        scaled_cols = [col for col in temporal_cols if col in exog_cols]
+        self.scaled_idx = torch.cat(
+            [torch.tensor([y_idx]), self._get_indexer(temporal_cols, scaled_cols)]
+        )
+        self.device = self.scaled_idx.device
+
+    @staticmethod
+    def _get_indexer(cols, names):
+        if not len(names):
+            return torch.empty(0, dtype=torch.long)
+        return torch.as_tensor(get_indexer_raise_missing(cols, names), dtype=torch.long)
+
+    def matches(self, temporal_cols, static_cols):
+        # Every batch carries the Indexes of its dataset, they're only compared
+        # when they were copied, e.g. by the workers of the loader
+        if temporal_cols is self.temporal_cols and static_cols is self.static_cols:
+            return True
+        if (static_cols is None) != (self.static_cols is None):
+            return False
+        same_static = static_cols is None or static_cols.equals(self.static_cols)
+        return same_static and temporal_cols.equals(self.temporal_cols)
+
+    def to(self, device):
+        schema = copy(self)
+        for attr in ["hist_exog_idx", "futr_exog_idx", "stat_exog_idx", "scaled_idx"]:
+            setattr(schema, attr, getattr(self, attr).to(device))
+        schema.device = device
+        return schema
+
+# %% ../../nbs/common.base_model.ipynb 4
+def _to_float32(output):
+    """Casts the floating tensors of a forward output, possibly nested in tuples or lists."""
+    if isinstance(output, torch.Tensor):
+        return output.float() if output.is_floating_point() else output
+    if isinstance(output, (tuple, list)):
+        return type(output)(_to_float32(o) for o in output)
+    return output
+
+
+def _fit_predict_group(models, dataset, fit_kwargs, predict_kwargs):
+    """Fit and/or predict `models`, several of them are fitted on the same training windows. Returns their forecasts."""
+    if fit_kwargs is not None:
+        if len(models) > 1:
+            models[0]._fit_shared_windows(models, dataset, **fit_kwargs)
+        else:
+            models[0].fit(dataset, **fit_kwargs)
+    if predict_kwargs is None:
+        return []
+    return [model.predict(dataset, **predict_kwargs) for model in models]
+
+
+def _fit_predict_in_process(models, dataset, n_threads, fit_kwargs, predict_kwargs):
+    """Fit and/or predict a group of models in a worker process of `NeuralForecast`, with `n_threads` threads."""
+    torch.set_num_threads(n_threads)
+    # the default loggers of the processes would race for the same version directory
+    default_logger = [model for model in models if "logger" not in model.trainer_kwargs]
+    for model in default_logger:
+        model.trainer_kwargs["logger"] = False
+    fcsts = _fit_predict_group(models, dataset, fit_kwargs, predict_kwargs)
+    for model in default_logger:
+        model.trainer_kwargs.pop("logger")
+    # the fitted models are sent back, predicting ones are unchanged
+    return models if fit_kwargs is not None else None, fcsts
+
+
+def _lightweight_device(trainer_kwargs):
+    """Device of the lightweight loop, the first one of the `accelerator` and `devices` of the trainer."""
+    accelerator = trainer_kwargs.get("accelerator", "auto")
+    if accelerator == "auto":
+        accelerator = "cuda" if torch.cuda.is_available() else "cpu"
+    if accelerator == "cpu":
+        return torch.device("cpu")
+    if accelerator not in ("gpu", "cuda", "mps"):
+        raise ValueError(
+            f"The lightweight loop trains on CPU, CUDA or MPS devices, got accelerator={accelerator!r}."
+        )
+    # devices is a number of devices, a list of indices or a string of either
+    devices = trainer_kwargs.get("devices", "auto")
+    if isinstance(devices, str) and devices != "auto":
+        devices = (
+            [int(d) for d in devices.split(",") if d.strip()]
+            if "," in devices
+            else int(devices)
+        )
+    index = devices[0] if isinstance(devices, (list, tuple)) else 0
+    return torch.device("mps" if accelerator == "mps" else f"cuda:{index}")
+
+
+class _LightweightFit:
+    """Optimization state of a model fitted without PyTorch Lightning's `Trainer`.
+
+    Takes the steps of the trainer without its callbacks, loggers and progress bar, on the
+    first device of the trainer's `accelerator` and `devices`. Validates every `val_check_steps`,
+    stops early after `early_stop_patience_steps` checks without improvement and steps the
+    learning rate scheduler of `configure_optimizers` every step. The losses can be computed
+    by `run` or passed to `step`, to drive several models with the same batches, then
+    `finish` moves the model back to the CPU like the trainer does."""
+
+    def __init__(self, model, datamodule):
+        self.model = model
+        self.datamodule = datamodule
+        model.trainer = None
+        model.to(_lightweight_device(model.trainer_kwargs))
+        model._lightweight_step = 0
+        model.on_fit_start()
+        optimization = model.configure_optimizers()
+        self.optimizer = optimization["optimizer"]
+        self.scheduler = optimization["lr_scheduler"]["scheduler"]
+        self.gradient_clip_val = model.trainer_kwargs.get("gradient_clip_val", None)
+        self.val_check_interval = model.trainer_kwargs["val_check_interval"]
+        self.best_valid_loss = np.inf
+        self.wait_count = 0
+        self.done = model.max_steps <= 0
+        model.train()
+
+    def step(self, loss):
+        model = self.model
+        self.optimizer.zero_grad()
+        loss.backward()
+        if self.gradient_clip_val is not None:
+            torch.nn.utils.clip_grad_norm_(model.parameters(), self.gradient_clip_val)
+        self.optimizer.step()
+        self.scheduler.step()
+        model._lightweight_step += 1
+        if (
+            model.val_size > 0
+            and model._lightweight_step % self.val_check_interval == 0
+        ):
+            self._validate()
+        if model._lightweight_step >= model.max_steps:
+            self.done = True
+
+    def _validate(self):
+        model = self.model
+        model.eval()
+        with torch.no_grad():
+            for batch_idx, batch in enumerate(self.datamodule.val_dataloader()):
+                model.validation_step(
+                    model._transfer_batch(self.datamodule, batch), batch_idx
+                )
+        model.on_validation_epoch_end()
+        model.train()
+        valid_loss = model.valid_trajectories[-1][1]
+        if valid_loss < self.best_valid_loss:
+            self.best_valid_loss = valid_loss
+            self.wait_count = 0
+        else:
+            self.wait_count += 1
+        if 0 < model.early_stop_patience_steps <= self.wait_count:
+            self.done = True
+
+    def finish(self):
+        # later fits with the trainer, global_step and log don't see the loop's steps
+        self.model._lightweight_step = None
+        self.model.cpu()
+
+    def run(self):
+        model = self.model
+        try:
+            while not self.done:
+                for batch_idx, batch in enumerate(self.datamodule.train_dataloader()):
+                    self.step(
+                        model.training_step(
+                            model._transfer_batch(self.datamodule, batch), batch_idx
+                        )
+                    )
+                    if self.done:
+                        break
+        finally:
+            self.finish()
+
+# %% ../../nbs/common.base_model.ipynb 5
 class BaseModel(pl.LightningModule):
     def __init__(
         self,
@@ -67,6 +265,7 @@ class BaseModel(pl.LightningModule):
             raise Exception("max_epochs is deprecated, use max_steps instead.")
 
         # Callbacks
+        self.early_stop_patience_steps = early_stop_patience_steps
         if early_stop_patience_steps > 0:
             if "callbacks" not in trainer_kwargs:
                 trainer_kwargs["callbacks"] = []
@@ -88,11 +287,70 @@ class BaseModel(pl.LightningModule):
         if trainer_kwargs.get("enable_checkpointing", None) is None:
             trainer_kwargs["enable_checkpointing"] = False
 
+        # bf16 mixed precision autocasts the forward passes of the networks, instead of
+        # the whole steps as the trainer would, other precisions are left to the trainer
+        self.autocast_dtype = None
+        if trainer_kwargs.get("precision", None) in ("bf16-mixed", "bf16"):
+            trainer_kwargs.pop("precision")
+            self.autocast_dtype = torch.bfloat16
+
+        # torch.compile of the forward passes, compiled on their first call
+        self.compile_forward = trainer_kwargs.pop("compile", False)
+        self._compiled_forwards = {}
+
+        # Minimal training loop instead of the trainer, for models whose steps are
+        # too short to amortize its callbacks, logging and progress bar
+        self.lightweight_trainer = trainer_kwargs.pop("lightweight_trainer", False)
+        self._lightweight_step = None
+
         self.trainer_kwargs = trainer_kwargs
 
+        # Column positions of the batches, set by fit and predict
+        self._batch_schema = None
+
     def __repr__(self):
         return type(self).__name__ if self.alias is None else self.alias
 
+    @property
+    def global_step(self):
+        if self._lightweight_step is not None:
+            return self._lightweight_step
+        return super().global_step
+
+    def log(self, *args, **kwargs):
+        # The lightweight loop only keeps the train and valid trajectories
+        if self._lightweight_step is not None:
+            return
+        super().log(*args, **kwargs)
+
+    def _forward(self, windows_batch, forward=None):
+        # The outputs are cast back to float32, so the scalers, losses, quantiles
+        # and sampling of the steps don't run in reduced precision
+        if self.compile_forward:
+            forward = self._get_compiled_forward(
+                self.forward if forward is None else forward
+            )
+        forward = self if forward is None else forward
+        if self.autocast_dtype is None:
+            return forward(windows_batch)
+        with torch.autocast(device_type=self.device.type, dtype=self.autocast_dtype):
+            output = forward(windows_batch)
+        return _to_float32(output)
+
+    def _get_compiled_forward(self, forward):
+        # Compiled once per forward method, the trainer switches the train and eval
+        # modes of the module, which are guards of the compiled graphs
+        name = forward.__name__
+        if name not in self._compiled_forwards:
+            self._compiled_forwards[name] = torch.compile(forward)
+        return self._compiled_forwards[name]
+
+    def __getstate__(self):
+        # The compiled functions aren't picklable, they're compiled again after loading
+        state = super().__getstate__()
+        state["_compiled_forwards"] = {}
+        return state
+
     def _check_exog(self, dataset):
         temporal_cols = set(dataset.temporal_cols.tolist())
         static_cols = set(
@@ -115,6 +373,38 @@ class BaseModel(pl.LightningModule):
                 f"{missing_stat} static exogenous variables not found in input dataset"
             )
 
+    def _set_batch_schema(self, dataset):
+        self._batch_schema = _BatchSchema(
+            temporal_cols=dataset.temporal_cols,
+            static_cols=dataset.static_cols,
+            y_idx=dataset.y_idx,
+            hist_exog_list=self.hist_exog_list,
+            futr_exog_list=self.futr_exog_list,
+            stat_exog_list=self.stat_exog_list,
+        )
+
+    def _get_batch_schema(self, batch, y_idx):
+        # Schema on the device of the batch, resolved again for batches that
+        # don't come from the dataset of the last fit or predict
+        schema = self._batch_schema
+        if (
+            schema is None
+            or schema.y_idx != y_idx
+            or not schema.matches(batch["temporal_cols"], batch.get("static_cols"))
+        ):
+            schema = _BatchSchema(
+                temporal_cols=batch["temporal_cols"],
+                static_cols=batch.get("static_cols"),
+                y_idx=y_idx,
+                hist_exog_list=self.hist_exog_list,
+                futr_exog_list=self.futr_exog_list,
+                stat_exog_list=self.stat_exog_list,
+            )
+        if schema.device != batch["temporal"].device:
+            schema = schema.to(batch["temporal"].device)
+        self._batch_schema = schema
+        return schema
+
     def _restart_seed(self, random_seed):
         if random_seed is None:
             random_seed = self.random_seed
@@ -125,7 +415,17 @@ class BaseModel(pl.LightningModule):
             set(temporal_cols.tolist()) & set(self.hist_exog_list + self.futr_exog_list)
         )
 
-    def _fit(
+    def _fit(self, dataset, **kwargs):
+        datamodule = self._prepare_fit(dataset, **kwargs)
+        if self.lightweight_trainer:
+            _LightweightFit(self, datamodule).run()
+            return
+        self._lightweight_step = None
+        trainer = pl.Trainer(**self.trainer_kwargs)
+        trainer.fit(self, datamodule=datamodule)
+        return trainer
+
+    def _prepare_fit(
         self,
         dataset,
         batch_size,
@@ -134,8 +434,15 @@ class BaseModel(pl.LightningModule):
         test_size=0,
         random_seed=None,
         shuffle_train=True,
+        bucket_by_length=False,
+        bucket_padding=0,
+        device_batches=False,
+        series_subset_size=None,
     ):
+        # Checks the dataset, seeds the model and sets the validation interval of the
+        # trainer, returns the datamodule of the fit
         self._check_exog(dataset)
+        self._set_batch_schema(dataset)
         self._restart_seed(random_seed)
 
         self.val_size = val_size
@@ -147,6 +454,10 @@ class BaseModel(pl.LightningModule):
             num_workers=self.num_workers_loader,
             drop_last=self.drop_last_loader,
             shuffle_train=shuffle_train,
+            bucket_by_length=bucket_by_length,
+            bucket_padding=bucket_padding,
+            device_batches=device_batches,
+            series_subset_size=series_subset_size,
         )
 
         if self.val_check_steps > self.max_steps:
@@ -157,10 +468,16 @@ class BaseModel(pl.LightningModule):
         val_check_interval = min(self.val_check_steps, self.max_steps)
         self.trainer_kwargs["val_check_interval"] = int(val_check_interval)
         self.trainer_kwargs["check_val_every_n_epoch"] = None
+        return datamodule
 
-        trainer = pl.Trainer(**self.trainer_kwargs)
-        trainer.fit(self, datamodule=datamodule)
-        return trainer
+    def _transfer_batch(self, datamodule, batch):
+        batch = self.transfer_batch_to_device(batch, self.device, dataloader_idx=0)
+        return datamodule.on_after_batch_transfer(batch, dataloader_idx=0)
+
+    def _shared_windows_key(self):
+        # Models with the same key can be fitted on the same training windows,
+        # see `BaseWindows._fit_shared_windows`
+        return None
 
     def on_fit_start(self):
         torch.manual_seed(self.random_seed)
@@ -204,4 +521,14 @@ class BaseModel(pl.LightningModule):
         self.validation_step_outputs.clear()  # free memory (compute `avg_loss` per epoch)
 
     def save(self, path):
+        if self._trainer is None:
+            # fitted by the lightweight loop or in another process, same format as the trainer's
+            checkpoint = {
+                "pytorch-lightning_version": pl.__version__,
+                "state_dict": self.state_dict(),
+                self.CHECKPOINT_HYPER_PARAMS_KEY: dict(self.hparams),
+            }
+            with fsspec.open(path, "wb") as f:
+                torch.save(checkpoint, f)
+            return
         self.trainer.save_checkpoint(path)
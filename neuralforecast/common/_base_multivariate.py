@@ -13,7 +13,6 @@ import neuralforecast.losses.pytorch as losses
 from ._base_model import BaseModel
 from ._scalers import TemporalNorm
 from ..tsdataset import TimeSeriesDataModule
-from ..utils import get_indexer_raise_missing
 
 # %% ../../nbs/common.base_multivariate.ipynb 6
 class BaseMultivariate(BaseModel):
@@ -26,6 +25,10 @@ class BaseMultivariate(BaseModel):
     - PyTorch Lightning's methods training_step, validation_step, predict_step.<br>
     - fit and predict methods used by NeuralForecast.core class.<br>
     - sampling and wrangling methods to generate multivariate windows.
+
+    Panels with more than `n_series` time-series are trained, validated and predicted over
+    consecutive chunks of `n_series` series, whose forecasts are stitched back together.
+    The chunks are fixed, so each series always takes the same position of the model.
     """
 
     def __init__(
@@ -39,6 +42,7 @@ class BaseMultivariate(BaseModel):
         val_check_steps,
         n_series,
         batch_size,
+        inference_windows_batch_size=-1,
         step_size=1,
         num_lr_decays=0,
         early_stop_patience_steps=-1,
@@ -95,6 +99,7 @@ class BaseMultivariate(BaseModel):
             )
 
         self.batch_size = batch_size
+        self.inference_windows_batch_size = inference_windows_batch_size
 
         # Optimization
         self.learning_rate = learning_rate
@@ -119,6 +124,11 @@ class BaseMultivariate(BaseModel):
         # Model state
         self.decompose_forecast = False
 
+        # Series chunks of panels with more than n_series series
+        self._series_subset_size = None
+        self._n_series_chunks = 1
+        self._series_overlap = 0
+
         # DataModule arguments
         self.num_workers_loader = num_workers_loader
         self.drop_last_loader = drop_last_loader
@@ -126,6 +136,28 @@ class BaseMultivariate(BaseModel):
         self.validation_step_outputs = []
         self.alias = alias
 
+    def _set_series_chunks(self, dataset):
+        # The last chunk starts early to hold n_series series,
+        # its first `_series_overlap` series belong to the previous chunk
+        n_groups = len(dataset)
+        if n_groups > self.n_series:
+            self._series_subset_size = self.n_series
+            self._n_series_chunks = -(-n_groups // self.n_series)
+            self._series_overlap = -n_groups % self.n_series
+        else:
+            self._series_subset_size = None
+            self._n_series_chunks = 1
+            self._series_overlap = 0
+
+    def _mask_series_overlap(self, outsample_mask, batch_idx):
+        # The overlapping series of the last chunk are trained and evaluated in the previous one
+        if self._series_overlap and (
+            batch_idx % self._n_series_chunks == self._n_series_chunks - 1
+        ):
+            outsample_mask = outsample_mask.clone()
+            outsample_mask[:, :, : self._series_overlap] = 0
+        return outsample_mask
+
     def _create_windows(self, batch, step):
         # Parse common data
         window_size = self.input_size + self.h
@@ -144,7 +176,7 @@ class BaseMultivariate(BaseModel):
             # [n_series, C, Ws, L+H] 0, 1, 2, 3
 
             # Sample and Available conditions
-            available_idx = temporal_cols.get_loc("available_mask")
+            available_idx = self._get_batch_schema(batch, batch["y_idx"]).mask_idx
             sample_condition = windows[:, available_idx, :, -self.h :]
             sample_condition = torch.sum(sample_condition, axis=2)  # Sum over time
             sample_condition = torch.sum(
@@ -239,18 +271,12 @@ class BaseMultivariate(BaseModel):
         # windows are already filtered by train/validation/test
         # from the `create_windows_method` nor leakage risk
         temporal = windows["temporal"]  # [Ws, C, L+H, n_series]
-        temporal_cols = windows["temporal_cols"].copy()  # [Ws, C, L+H, n_series]
 
         # To avoid leakage uses only the lags
-        temporal_data_cols = self._get_temporal_exogenous_cols(
-            temporal_cols=temporal_cols
-        )
-        temporal_idxs = get_indexer_raise_missing(temporal_cols, temporal_data_cols)
-        temporal_idxs = np.append(y_idx, temporal_idxs)
+        schema = self._get_batch_schema(windows, y_idx)
+        temporal_idxs = schema.scaled_idx
         temporal_data = temporal[:, temporal_idxs, :, :]
-        temporal_mask = temporal[
-            :, temporal_cols.get_loc("available_mask"), :, :
-        ].clone()
+        temporal_mask = temporal[:, schema.mask_idx, :, :].clone()
         temporal_mask[:, -self.h :, :] = 0.0
 
         # Normalize. self.scaler stores the shift and scale for inverse transform
@@ -294,8 +320,9 @@ class BaseMultivariate(BaseModel):
         # Temporal: [Ws, C, L+H, n_series]
 
         # Filter insample lags from outsample horizon
-        mask_idx = batch["temporal_cols"].get_loc("available_mask")
         y_idx = batch["y_idx"]
+        schema = self._get_batch_schema(windows, y_idx)
+        mask_idx = schema.mask_idx
         insample_y = windows["temporal"][:, y_idx, : -self.h, :]
         insample_mask = windows["temporal"][:, mask_idx, : -self.h, :]
         outsample_y = windows["temporal"][:, y_idx, -self.h :, :]
@@ -303,28 +330,19 @@ class BaseMultivariate(BaseModel):
 
         # Filter historic exogenous variables
         if len(self.hist_exog_list):
-            hist_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.hist_exog_list
-            )
-            hist_exog = windows["temporal"][:, hist_exog_idx, : -self.h, :]
+            hist_exog = windows["temporal"][:, schema.hist_exog_idx, : -self.h, :]
         else:
             hist_exog = None
 
         # Filter future exogenous variables
         if len(self.futr_exog_list):
-            futr_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.futr_exog_list
-            )
-            futr_exog = windows["temporal"][:, futr_exog_idx, :, :]
+            futr_exog = windows["temporal"][:, schema.futr_exog_idx, :, :]
         else:
             futr_exog = None
 
         # Filter static variables
         if len(self.stat_exog_list):
-            static_idx = get_indexer_raise_missing(
-                windows["static_cols"], self.stat_exog_list
-            )
-            stat_exog = windows["static"][:, static_idx]
+            stat_exog = windows["static"][:, schema.stat_exog_idx]
         else:
             stat_exog = None
 
@@ -354,6 +372,7 @@ class BaseMultivariate(BaseModel):
             futr_exog,
             stat_exog,
         ) = self._parse_windows(batch, windows)
+        outsample_mask = self._mask_series_overlap(outsample_mask, batch_idx)
 
         windows_batch = dict(
             insample_y=insample_y,  # [batch_size, L, n_series]
@@ -364,7 +383,7 @@ class BaseMultivariate(BaseModel):
         )  # [n_series, n_feats]
 
         # Model Predictions
-        output = self(windows_batch)
+        output = self._forward(windows_batch)
         if self.loss.is_distribution_output:
             outsample_y, y_loc, y_scale = self._inv_normalization(
                 y_hat=outsample_y, temporal_cols=batch["temporal_cols"], y_idx=y_idx
@@ -387,39 +406,12 @@ class BaseMultivariate(BaseModel):
         self.train_trajectories.append((self.global_step, float(loss)))
         return loss
 
-    def validation_step(self, batch, batch_idx):
-        if self.val_size == 0:
-            return np.nan
-
-        # Create and normalize windows [Ws, L+H, C]
-        windows = self._create_windows(batch, step="val")
-        y_idx = batch["y_idx"]
-        windows = self._normalization(windows=windows, y_idx=y_idx)
-
-        # Parse windows
-        (
-            insample_y,
-            insample_mask,
-            outsample_y,
-            outsample_mask,
-            hist_exog,
-            futr_exog,
-            stat_exog,
-        ) = self._parse_windows(batch, windows)
-
-        windows_batch = dict(
-            insample_y=insample_y,  # [Ws, L]
-            insample_mask=insample_mask,  # [Ws, L]
-            futr_exog=futr_exog,  # [Ws, L+H]
-            hist_exog=hist_exog,  # [Ws, L]
-            stat_exog=stat_exog,
-        )  # [Ws, 1]
-
-        # Model Predictions
-        output = self(windows_batch)
+    def _compute_valid_loss(
+        self, outsample_y, output, outsample_mask, temporal_cols, y_idx
+    ):
         if self.loss.is_distribution_output:
             outsample_y, y_loc, y_scale = self._inv_normalization(
-                y_hat=outsample_y, temporal_cols=batch["temporal_cols"], y_idx=y_idx
+                y_hat=outsample_y, temporal_cols=temporal_cols, y_idx=y_idx
             )
             distr_args = self.loss.scale_decouple(
                 output=output, loc=y_loc, scale=y_scale
@@ -440,6 +432,68 @@ class BaseMultivariate(BaseModel):
             valid_loss = self.valid_loss(
                 y=outsample_y, y_hat=output, mask=outsample_mask
             )
+        return valid_loss
+
+    def _inference_windows_batches(self, windows):
+        # Consecutive chunks of at most inference_windows_batch_size windows,
+        # each one gathered from the windows view before it is normalized
+        n_windows = len(windows["temporal"])
+        windows_batch_size = self.inference_windows_batch_size
+        if windows_batch_size < 0:
+            windows_batch_size = n_windows
+        for start in range(0, n_windows, windows_batch_size):
+            w_idxs = np.arange(start, min(start + windows_batch_size, n_windows))
+            yield dict(windows, temporal=windows["temporal"][w_idxs])
+
+    def validation_step(self, batch, batch_idx):
+        if self.val_size == 0:
+            return np.nan
+
+        # Create windows [Ws, C, L+H, n_series], normalized by chunks of windows
+        all_windows = self._create_windows(batch, step="val")
+        y_idx = batch["y_idx"]
+
+        valid_losses = []
+        batch_sizes = []
+        for windows in self._inference_windows_batches(all_windows):
+            windows = self._normalization(windows=windows, y_idx=y_idx)
+
+            # Parse windows
+            (
+                insample_y,
+                insample_mask,
+                outsample_y,
+                outsample_mask,
+                hist_exog,
+                futr_exog,
+                stat_exog,
+            ) = self._parse_windows(batch, windows)
+
+            outsample_mask = self._mask_series_overlap(outsample_mask, batch_idx)
+
+            windows_batch = dict(
+                insample_y=insample_y,  # [Ws, L]
+                insample_mask=insample_mask,  # [Ws, L]
+                futr_exog=futr_exog,  # [Ws, L+H]
+                hist_exog=hist_exog,  # [Ws, L]
+                stat_exog=stat_exog,
+            )  # [Ws, 1]
+
+            # Model Predictions
+            output_batch = self._forward(windows_batch)
+            valid_loss_batch = self._compute_valid_loss(
+                outsample_y=outsample_y,
+                output=output_batch,
+                outsample_mask=outsample_mask,
+                temporal_cols=batch["temporal_cols"],
+                y_idx=y_idx,
+            )
+            valid_losses.append(valid_loss_batch)
+            batch_sizes.append(len(insample_y))
+
+        valid_loss = torch.stack(valid_losses)
+        batch_sizes = torch.tensor(batch_sizes).to(valid_loss.device)
+        valid_loss = torch.sum(valid_loss * batch_sizes) / torch.sum(batch_sizes)
 
         if torch.isnan(valid_loss):
             raise Exception("Loss is NaN, training stopped.")
@@ -449,45 +503,50 @@ class BaseMultivariate(BaseModel):
         return valid_loss
 
     def predict_step(self, batch, batch_idx):
-        # Create and normalize windows [Ws, L+H, C]
-        windows = self._create_windows(batch, step="predict")
+        # Create windows [Ws, C, L+H, n_series], normalized by chunks of windows
+        all_windows = self._create_windows(batch, step="predict")
         y_idx = batch["y_idx"]
-        windows = self._normalization(windows=windows, y_idx=y_idx)
 
-        # Parse windows
-        insample_y, insample_mask, _, _, hist_exog, futr_exog, stat_exog = (
-            self._parse_windows(batch, windows)
-        )
-
-        windows_batch = dict(
-            insample_y=insample_y,  # [Ws, L]
-            insample_mask=insample_mask,  # [Ws, L]
-            futr_exog=futr_exog,  # [Ws, L+H]
-            hist_exog=hist_exog,  # [Ws, L]
-            stat_exog=stat_exog,
-        )  # [Ws, 1]
+        y_hats = []
+        for windows in self._inference_windows_batches(all_windows):
+            windows = self._normalization(windows=windows, y_idx=y_idx)
 
-        # Model Predictions
-        output = self(windows_batch)
-        if self.loss.is_distribution_output:
-            _, y_loc, y_scale = self._inv_normalization(
-                y_hat=output[0], temporal_cols=batch["temporal_cols"], y_idx=y_idx
-            )
-            distr_args = self.loss.scale_decouple(
-                output=output, loc=y_loc, scale=y_scale
+            # Parse windows
+            insample_y, insample_mask, _, _, hist_exog, futr_exog, stat_exog = (
+                self._parse_windows(batch, windows)
             )
-            _, y_hat = self.loss.sample(distr_args=distr_args)
 
-            if self.loss.return_params:
-                distr_args = torch.stack(distr_args, dim=-1)
-                distr_args = torch.reshape(
-                    distr_args, (len(windows["temporal"]), self.h, -1)
+            windows_batch = dict(
+                insample_y=insample_y,  # [Ws, L]
+                insample_mask=insample_mask,  # [Ws, L]
+                futr_exog=futr_exog,  # [Ws, L+H]
+                hist_exog=hist_exog,  # [Ws, L]
+                stat_exog=stat_exog,
+            )  # [Ws, 1]
+
+            # Model Predictions
+            output = self._forward(windows_batch)
+            if self.loss.is_distribution_output:
+                _, y_loc, y_scale = self._inv_normalization(
+                    y_hat=output[0], temporal_cols=batch["temporal_cols"], y_idx=y_idx
                 )
-                y_hat = torch.concat((y_hat, distr_args), axis=2)
-        else:
-            y_hat, _, _ = self._inv_normalization(
-                y_hat=output, temporal_cols=batch["temporal_cols"], y_idx=y_idx
-            )
+                distr_args = self.loss.scale_decouple(
+                    output=output, loc=y_loc, scale=y_scale
+                )
+                _, y_hat = self.loss.sample(distr_args=distr_args)
+
+                if self.loss.return_params:
+                    distr_args = torch.stack(distr_args, dim=-1)
+                    distr_args = torch.reshape(
+                        distr_args, (len(windows["temporal"]), self.h, -1)
+                    )
+                    y_hat = torch.concat((y_hat, distr_args), axis=2)
+            else:
+                y_hat, _, _ = self._inv_normalization(
+                    y_hat=output, temporal_cols=batch["temporal_cols"], y_idx=y_idx
+                )
+            y_hats.append(y_hat)
+        y_hat = torch.cat(y_hats, dim=0)
         return y_hat
 
     def fit(self, dataset, val_size=0, test_size=0, random_seed=None):
@@ -511,6 +570,8 @@ class BaseMultivariate(BaseModel):
         `val_size`: int, validation size for temporal cross-validation.<br>
         `test_size`: int, test size for temporal cross-validation.<br>
         """
+        self._set_series_chunks(dataset)
+        # The chunks of larger panels keep their order, the last one is recognized by batch_idx
         return self._fit(
             dataset=dataset,
             batch_size=self.n_series,
@@ -518,6 +579,7 @@ class BaseMultivariate(BaseModel):
             test_size=test_size,
             random_seed=random_seed,
             shuffle_train=False,
+            series_subset_size=self._series_subset_size,
         )
 
     def predict(
@@ -539,12 +601,17 @@ class BaseMultivariate(BaseModel):
         `**data_module_kwargs`: PL's TimeSeriesDataModule args, see [documentation](https://pytorch-lightning.readthedocs.io/en/1.6.1/extensions/datamodules.html#using-a-datamodule).
         """
         self._check_exog(dataset)
+        self._set_batch_schema(dataset)
         self._restart_seed(random_seed)
 
         self.predict_step_size = step_size
         self.decompose_forecast = False
+        self._set_series_chunks(dataset)
         datamodule = TimeSeriesDataModule(
-            dataset=dataset, batch_size=self.n_series, **data_module_kwargs
+            dataset=dataset,
+            batch_size=self.n_series,
+            series_subset_size=self._series_subset_size,
+            **data_module_kwargs,
         )
 
         # Protect when case of multiple gpu. PL does not support return preds with multiple gpu.
@@ -556,7 +623,9 @@ class BaseMultivariate(BaseModel):
 
         trainer = pl.Trainer(**pred_trainer_kwargs)
         fcsts = trainer.predict(self, datamodule=datamodule)
-        fcsts = torch.vstack(fcsts).numpy()
+        # Stitch the chunks of series [Ws, H, n_series], dropping the overlap of the last one
+        fcsts[-1] = fcsts[-1][:, :, self._series_overlap :]
+        fcsts = torch.cat(fcsts, dim=2).numpy()
 
         fcsts = np.transpose(fcsts, (2, 0, 1))
         fcsts = fcsts.flatten()
@@ -12,7 +12,6 @@ import pytorch_lightning as pl
 from ._base_model import BaseModel
 from ._scalers import TemporalNorm
 from ..tsdataset import TimeSeriesDataModule
-from ..utils import get_indexer_raise_missing
 
 # %% ../../nbs/common.base_recurrent.ipynb 7
 class BaseRecurrent(BaseModel):
@@ -47,6 +46,8 @@ class BaseRecurrent(BaseModel):
         stat_exog_list=None,
         num_workers_loader=0,
         drop_last_loader=False,
+        bucket_by_length=False,
+        device_batches=False,
         random_seed=1,
         alias=None,
         optimizer=None,
@@ -114,23 +115,20 @@ class BaseRecurrent(BaseModel):
         # DataModule arguments
         self.num_workers_loader = num_workers_loader
         self.drop_last_loader = drop_last_loader
+        self.bucket_by_length = bucket_by_length
+        self.device_batches = device_batches
         # used by on_validation_epoch_end hook
         self.validation_step_outputs = []
         self.alias = alias
 
     def _normalization(self, batch, val_size=0, test_size=0):
         temporal = batch["temporal"]  # B, C, T
-        temporal_cols = batch["temporal_cols"].copy()
-        y_idx = batch["y_idx"]
+        schema = self._get_batch_schema(batch, batch["y_idx"])
 
         # Separate data and mask
-        temporal_data_cols = self._get_temporal_exogenous_cols(
-            temporal_cols=temporal_cols
-        )
-        temporal_idxs = get_indexer_raise_missing(temporal_cols, temporal_data_cols)
-        temporal_idxs = np.append(y_idx, temporal_idxs)
+        temporal_idxs = schema.scaled_idx
         temporal_data = temporal[:, temporal_idxs, :]
-        temporal_mask = temporal[:, temporal_cols.get_loc("available_mask"), :].clone()
+        temporal_mask = temporal[:, schema.mask_idx, :].clone()
 
         # Remove validation and test set to prevent leakeage
         if val_size + test_size > 0:
@@ -168,6 +166,8 @@ class BaseRecurrent(BaseModel):
         return y_hat, y_loc, y_scale
 
     def _create_windows(self, batch, step):
+        # The series are sliced to the timestamps of the windows that are used before
+        # padding them, the windows are a strided view of that span
         temporal = batch["temporal"]
         temporal_cols = batch["temporal_cols"]
 
@@ -175,17 +175,17 @@ class BaseRecurrent(BaseModel):
             if self.val_size + self.test_size > 0:
                 cutoff = -self.val_size - self.test_size
                 temporal = temporal[:, :, :cutoff]
-            temporal = self.padder(temporal)
 
-            # Truncate batch to shorter time-series
+            # Truncate batch to shorter time-series, the padded timestamps aren't available
             av_condition = torch.nonzero(
                 torch.min(
-                    temporal[:, temporal_cols.get_loc("available_mask")], axis=0
+                    temporal[:, self._get_batch_schema(batch, batch["y_idx"]).mask_idx],
+                    axis=0,
                 ).values
             )
             min_time_stamp = int(av_condition.min())
 
-            available_ts = temporal.shape[-1] - min_time_stamp
+            available_ts = temporal.shape[-1] + self.h - min_time_stamp
             if available_ts < 1 + self.h:
                 raise Exception(
                     "Time series too short for given input and output size. \n"
@@ -194,13 +194,37 @@ class BaseRecurrent(BaseModel):
 
             temporal = temporal[:, :, min_time_stamp:]
 
+            # Truncated backprogatation (shorten sequence where RNNs unroll)
+            n_windows = temporal.shape[-1]
+            if (self.input_size > 0) and (n_windows > self.input_size):
+                max_sampleable_time = n_windows - self.input_size + 1
+                start = np.random.choice(max_sampleable_time)
+                temporal = temporal[:, :, start : (start + self.input_size + self.h)]
+                # Pad only the horizon past the end of the series
+                temporal = nn.functional.pad(
+                    temporal, (0, self.input_size + self.h - temporal.shape[-1])
+                )
+            else:
+                temporal = self.padder(temporal)
+
         if step == "val":
             if self.test_size > 0:
                 temporal = temporal[:, :, : -self.test_size]
+            # Truncated inference
+            if self.inference_input_size > 0:
+                cutoff = self.inference_input_size + self.val_size
+                temporal = temporal[:, :, -cutoff:]
             temporal = self.padder(temporal)
 
         if step == "predict":
-            if (self.test_size == 0) and (len(self.futr_exog_list) == 0):
+            padded = (self.test_size == 0) and (len(self.futr_exog_list) == 0)
+            # Truncated inference, without padding the last h timestamps are only targets
+            if self.inference_input_size > 0:
+                cutoff = self.inference_input_size + self.test_size
+                if not padded:
+                    cutoff += self.h
+                temporal = temporal[:, :, -cutoff:]
+            if padded:
                 temporal = self.padder(temporal)
 
             # Test size covers all data, pad left one timestep with zeros
@@ -212,24 +236,6 @@ class BaseRecurrent(BaseModel):
         window_size = 1 + self.h  # 1 for current t and h for future
         windows = temporal.unfold(dimension=-1, size=window_size, step=1)
 
-        # Truncated backprogatation/inference (shorten sequence where RNNs unroll)
-        n_windows = windows.shape[2]
-        input_size = -1
-        if (step == "train") and (self.input_size > 0):
-            input_size = self.input_size
-            if (input_size > 0) and (n_windows > input_size):
-                max_sampleable_time = n_windows - self.input_size + 1
-                start = np.random.choice(max_sampleable_time)
-                windows = windows[:, :, start : (start + input_size), :]
-
-        if (step == "val") and (self.inference_input_size > 0):
-            cutoff = self.inference_input_size + self.val_size
-            windows = windows[:, :, -cutoff:, :]
-
-        if (step == "predict") and (self.inference_input_size > 0):
-            cutoff = self.inference_input_size + self.test_size
-            windows = windows[:, :, -cutoff:, :]
-
         # [B, C, input_size, 1+H]
         windows_batch = dict(
             temporal=windows,
@@ -243,36 +249,29 @@ class BaseRecurrent(BaseModel):
     def _parse_windows(self, batch, windows):
         # [B, C, seq_len, 1+H]
         # Filter insample lags from outsample horizon
-        mask_idx = batch["temporal_cols"].get_loc("available_mask")
         y_idx = batch["y_idx"]
+        schema = self._get_batch_schema(windows, y_idx)
+        mask_idx = schema.mask_idx
         insample_y = windows["temporal"][:, y_idx, :, : -self.h]
         insample_mask = windows["temporal"][:, mask_idx, :, : -self.h]
-        outsample_y = windows["temporal"][:, y_idx, :, -self.h :].contiguous()
-        outsample_mask = windows["temporal"][:, mask_idx, :, -self.h :].contiguous()
+        # the targets stay strided views of the windows, [B, seq_len, H]
+        outsample_y = windows["temporal"][:, y_idx, :, -self.h :]
+        outsample_mask = windows["temporal"][:, mask_idx, :, -self.h :]
 
         # Filter historic exogenous variables
         if len(self.hist_exog_list):
-            hist_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.hist_exog_list
-            )
-            hist_exog = windows["temporal"][:, hist_exog_idx, :, : -self.h]
+            hist_exog = windows["temporal"][:, schema.hist_exog_idx, :, : -self.h]
         else:
             hist_exog = None
 
         # Filter future exogenous variables
         if len(self.futr_exog_list):
-            futr_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.futr_exog_list
-            )
-            futr_exog = windows["temporal"][:, futr_exog_idx, :, :]
+            futr_exog = windows["temporal"][:, schema.futr_exog_idx, :, :]
         else:
             futr_exog = None
         # Filter static variables
         if len(self.stat_exog_list):
-            static_idx = get_indexer_raise_missing(
-                windows["static_cols"], self.stat_exog_list
-            )
-            stat_exog = windows["static"][:, static_idx]
+            stat_exog = windows["static"][:, schema.stat_exog_idx]
         else:
             stat_exog = None
 
@@ -313,7 +312,7 @@ class BaseRecurrent(BaseModel):
         )  # [B, S]
 
         # Model predictions
-        output = self(windows_batch)  # tuple([B, seq_len, H, output])
+        output = self._forward(windows_batch)  # tuple([B, seq_len, H, output])
         if self.loss.is_distribution_output:
             outsample_y, y_loc, y_scale = self._inv_normalization(
                 y_hat=outsample_y,
@@ -324,8 +323,8 @@ class BaseRecurrent(BaseModel):
             T = output[0].size()[1]
             H = output[0].size()[2]
             output = [arg.view(-1, *(arg.size()[2:])) for arg in output]
-            outsample_y = outsample_y.view(B * T, H)
-            outsample_mask = outsample_mask.view(B * T, H)
+            outsample_y = outsample_y.reshape(B * T, H)
+            outsample_mask = outsample_mask.reshape(B * T, H)
             y_loc = y_loc.repeat_interleave(repeats=T, dim=0).squeeze(-1)
             y_scale = y_scale.repeat_interleave(repeats=T, dim=0).squeeze(-1)
             distr_args = self.loss.scale_decouple(
@@ -385,7 +384,7 @@ class BaseRecurrent(BaseModel):
         outsample_mask = outsample_mask[:, -val_windows:-1, :]
 
         # Model predictions
-        output = self(windows_batch)  # tuple([B, seq_len, H, output])
+        output = self._forward(windows_batch)  # tuple([B, seq_len, H, output])
         if self.loss.is_distribution_output:
             output = [arg[:, -val_windows:-1] for arg in output]
             outsample_y, y_loc, y_scale = self._inv_normalization(
@@ -466,7 +465,7 @@ class BaseRecurrent(BaseModel):
         )  # [B, S]
 
         # Model Predictions
-        output = self(windows_batch)  # tuple([B, seq_len, H], ...)
+        output = self._forward(windows_batch)  # tuple([B, seq_len, H], ...)
         if self.loss.is_distribution_output:
             _, y_loc, y_scale = self._inv_normalization(
                 y_hat=output[0], temporal_cols=batch["temporal_cols"], y_idx=y_idx
@@ -523,6 +522,8 @@ class BaseRecurrent(BaseModel):
             val_size=val_size,
             test_size=test_size,
             random_seed=random_seed,
+            bucket_by_length=self.bucket_by_length,
+            device_batches=self.device_batches,
         )
 
     def predict(self, dataset, step_size=1, random_seed=None, **data_module_kwargs):
@@ -537,6 +538,7 @@ class BaseRecurrent(BaseModel):
         `**data_module_kwargs`: PL's TimeSeriesDataModule args, see [documentation](https://pytorch-lightning.readthedocs.io/en/1.6.1/extensions/datamodules.html#using-a-datamodule).
         """
         self._check_exog(dataset)
+        self._set_batch_schema(dataset)
         self._restart_seed(random_seed)
 
         if step_size > 1:
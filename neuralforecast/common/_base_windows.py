@@ -9,10 +9,13 @@ import torch
 import torch.nn as nn
 import pytorch_lightning as pl
 
-from ._base_model import BaseModel
+from neuralforecast.common._base_model import (
+    BaseModel,
+    _LightweightFit,
+    _lightweight_device,
+)
 from ._scalers import TemporalNorm
 from ..tsdataset import TimeSeriesDataModule
-from ..utils import get_indexer_raise_missing
 
 # %% ../../nbs/common.base_windows.ipynb 6
 class BaseWindows(BaseModel):
@@ -51,6 +54,8 @@ class BaseWindows(BaseModel):
         exclude_insample_y=False,
         num_workers_loader=0,
         drop_last_loader=False,
+        bucket_by_length=False,
+        device_batches=False,
         random_seed=1,
         alias=None,
         optimizer=None,
@@ -126,6 +131,8 @@ class BaseWindows(BaseModel):
         # DataModule arguments
         self.num_workers_loader = num_workers_loader
         self.drop_last_loader = drop_last_loader
+        self.bucket_by_length = bucket_by_length
+        self.device_batches = device_batches
         # used by on_validation_epoch_end hook
         self.validation_step_outputs = []
         self.alias = alias
@@ -146,53 +153,72 @@ class BaseWindows(BaseModel):
                 raise Exception(
                     "Time series is too short for training, consider setting a smaller input size or set start_padding_enabled=True"
                 )
-            windows = temporal.unfold(
-                dimension=-1, size=window_size, step=self.step_size
+            # Availability of every window from the prefix sums of the mask,
+            # so only the sampled windows are gathered
+            available_idx = self._get_batch_schema(batch, batch["y_idx"]).mask_idx
+            available = (temporal[:, available_idx] > 0).to(torch.int32)
+            available = nn.functional.pad(available.cumsum(dim=-1), (1, 0))
+            starts = torch.arange(
+                0,
+                temporal.shape[-1] - window_size + 1,
+                self.step_size,
+                device=temporal.device,
+            )
+            available_condition = (
+                available[:, starts + self.input_size] - available[:, starts]
             )
-
-            # [B, C, Ws, L+H] 0, 1, 2, 3
-            # -> [B * Ws, L+H, C] 0, 2, 3, 1
-            windows_per_serie = windows.shape[2]
-            windows = windows.permute(0, 2, 3, 1).contiguous()
-            windows = windows.reshape(-1, window_size, len(temporal_cols))
-
-            # Sample and Available conditions
-            available_idx = temporal_cols.get_loc("available_mask")
-            available_condition = windows[:, : self.input_size, available_idx]
-            available_condition = torch.sum(available_condition, axis=1)
             final_condition = available_condition > 0
             if self.h > 0:
-                sample_condition = windows[:, self.input_size :, available_idx]
-                sample_condition = torch.sum(sample_condition, axis=1)
+                sample_condition = (
+                    available[:, starts + window_size]
+                    - available[:, starts + self.input_size]
+                )
                 final_condition = (sample_condition > 0) & (available_condition > 0)
-            windows = windows[final_condition]
 
-            # Parse Static data to match windows
-            # [B, S_in] -> [B, Ws, S_in] -> [B*Ws, S_in]
-            static = batch.get("static", None)
-            static_cols = batch.get("static_cols", None)
-            if static is not None:
-                static = torch.repeat_interleave(
-                    static, repeats=windows_per_serie, dim=0
-                )
-                static = static[final_condition]
+            # [B, Ws] -> (serie, window) pairs, ordered like the flattened windows
+            serie_idxs, window_idxs = torch.nonzero(final_condition, as_tuple=True)
 
             # Protection of empty windows
-            if final_condition.sum() == 0:
+            if len(serie_idxs) == 0:
                 raise Exception("No windows available for training")
 
             # Sample windows
-            n_windows = len(windows)
+            n_windows = len(serie_idxs)
             if self.windows_batch_size is not None:
-                w_idxs = np.random.choice(
-                    n_windows,
-                    size=self.windows_batch_size,
-                    replace=(n_windows < self.windows_batch_size),
-                )
-                windows = windows[w_idxs]
+                if self.device_batches:
+                    # sampled with torch's generator, on the device of the batch
+                    if n_windows < self.windows_batch_size:
+                        w_idxs = torch.randint(
+                            n_windows,
+                            size=(self.windows_batch_size,),
+                            device=temporal.device,
+                        )
+                    else:
+                        w_idxs = torch.randperm(n_windows, device=temporal.device)[
+                            : self.windows_batch_size
+                        ]
+                else:
+                    w_idxs = np.random.choice(
+                        n_windows,
+                        size=self.windows_batch_size,
+                        replace=(n_windows < self.windows_batch_size),
+                    )
+                    w_idxs = torch.as_tensor(w_idxs, device=temporal.device)
+                serie_idxs = serie_idxs[w_idxs]
+                window_idxs = window_idxs[w_idxs]
+
+            # [B, C, T] -> [Ws, L+H, C]
+            time_idxs = starts[window_idxs].unsqueeze(1) + torch.arange(
+                window_size, device=temporal.device
+            )
+            windows = temporal.permute(0, 2, 1)[serie_idxs.unsqueeze(1), time_idxs]
 
-                if static is not None:
-                    static = static[w_idxs]
+            # Parse Static data to match windows
+            # [B, S_in] -> [Ws, S_in]
+            static = batch.get("static", None)
+            static_cols = batch.get("static_cols", None)
+            if static is not None:
+                static = static[serie_idxs]
 
             # think about interaction available * sample mask
             # [B, C, Ws, L+H]
@@ -202,101 +228,164 @@ class BaseWindows(BaseModel):
                 static=static,
                 static_cols=static_cols,
             )
+
+            # Scaler statistics of the sampled windows [Ws, 1, C]
+            statistics = self._window_statistics(temporal, batch, self.step_size)
+            if statistics is not None:
+                x_shift, x_scale = statistics
+                windows_batch["x_shift"] = x_shift[serie_idxs, window_idxs].unsqueeze(1)
+                windows_batch["x_scale"] = x_scale[serie_idxs, window_idxs].unsqueeze(1)
             return windows_batch
 
         elif step in ["predict", "val"]:
+            windows = self._create_windows_view(batch, step)
+            if w_idxs is None:
+                w_idxs = np.arange(
+                    windows["temporal"].shape[0] * windows["temporal"].shape[1]
+                )
+            return self._sample_windows(windows, w_idxs)
+        else:
+            raise ValueError(f"Unknown step {step}")
 
-            if step == "predict":
-                initial_input = temporal.shape[-1] - self.test_size
-                if (
-                    initial_input <= self.input_size
-                ):  # There is not enough data to predict first timestamp
-                    padder_left = nn.ConstantPad1d(
-                        padding=(self.input_size - initial_input, 0), value=0
-                    )
-                    temporal = padder_left(temporal)
-                predict_step_size = self.predict_step_size
-                cutoff = -self.input_size - self.test_size
-                temporal = temporal[:, :, cutoff:]
-
-            elif step == "val":
-                predict_step_size = self.step_size
-                cutoff = -self.input_size - self.val_size - self.test_size
-                if self.test_size > 0:
-                    temporal = batch["temporal"][:, :, cutoff : -self.test_size]
-                else:
-                    temporal = batch["temporal"][:, :, cutoff:]
-                if temporal.shape[-1] < window_size:
-                    initial_input = temporal.shape[-1] - self.val_size
-                    padder_left = nn.ConstantPad1d(
-                        padding=(self.input_size - initial_input, 0), value=0
-                    )
-                    temporal = padder_left(temporal)
+    def _create_windows_view(self, batch, step):
+        # Parse common data
+        window_size = self.input_size + self.h
+        temporal_cols = batch["temporal_cols"]
+        temporal = batch["temporal"]
 
+        if step == "predict":
+            initial_input = temporal.shape[-1] - self.test_size
             if (
-                (step == "predict")
-                and (self.test_size == 0)
-                and (len(self.futr_exog_list) == 0)
-            ):
-                padder_right = nn.ConstantPad1d(padding=(0, self.h), value=0)
-                temporal = padder_right(temporal)
-
-            windows = temporal.unfold(
-                dimension=-1, size=window_size, step=predict_step_size
-            )
+                initial_input <= self.input_size
+            ):  # There is not enough data to predict first timestamp
+                padder_left = nn.ConstantPad1d(
+                    padding=(self.input_size - initial_input, 0), value=0
+                )
+                temporal = padder_left(temporal)
+            predict_step_size = self.predict_step_size
+            cutoff = -self.input_size - self.test_size
+            temporal = temporal[:, :, cutoff:]
+
+        elif step == "val":
+            predict_step_size = self.step_size
+            cutoff = -self.input_size - self.val_size - self.test_size
+            if self.test_size > 0:
+                temporal = batch["temporal"][:, :, cutoff : -self.test_size]
+            else:
+                temporal = batch["temporal"][:, :, cutoff:]
+            if temporal.shape[-1] < window_size:
+                initial_input = temporal.shape[-1] - self.val_size
+                padder_left = nn.ConstantPad1d(
+                    padding=(self.input_size - initial_input, 0), value=0
+                )
+                temporal = padder_left(temporal)
 
-            # [batch, channels, windows, window_size] 0, 1, 2, 3
-            # -> [batch * windows, window_size, channels] 0, 2, 3, 1
-            windows_per_serie = windows.shape[2]
-            windows = windows.permute(0, 2, 3, 1).contiguous()
-            windows = windows.reshape(-1, window_size, len(temporal_cols))
+        if (
+            (step == "predict")
+            and (self.test_size == 0)
+            and (len(self.futr_exog_list) == 0)
+        ):
+            padder_right = nn.ConstantPad1d(padding=(0, self.h), value=0)
+            temporal = padder_right(temporal)
 
-            static = batch.get("static", None)
-            static_cols = batch.get("static_cols", None)
-            if static is not None:
-                static = torch.repeat_interleave(
-                    static, repeats=windows_per_serie, dim=0
-                )
+        windows = temporal.unfold(
+            dimension=-1, size=window_size, step=predict_step_size
+        )
 
-            # Sample windows for batched prediction
-            if w_idxs is not None:
-                windows = windows[w_idxs]
-                if static is not None:
-                    static = static[w_idxs]
+        # [batch, channels, windows, window_size] 0, 1, 2, 3
+        # -> [batch, windows, window_size, channels] 0, 2, 3, 1
+        # the windows are a strided view of temporal, they're only copied by _sample_windows
+        windows = windows.permute(0, 2, 3, 1)
 
-            windows_batch = dict(
-                temporal=windows,
-                temporal_cols=temporal_cols,
-                static=static,
-                static_cols=static_cols,
-            )
-            return windows_batch
-        else:
-            raise ValueError(f"Unknown step {step}")
+        windows_batch = dict(
+            temporal=windows,
+            temporal_cols=temporal_cols,
+            static=batch.get("static", None),
+            static_cols=batch.get("static_cols", None),
+        )
+
+        # Scaler statistics of every window [batch, windows, channels]
+        statistics = self._window_statistics(temporal, batch, predict_step_size)
+        if statistics is not None:
+            x_shift, x_scale = statistics
+            windows_batch["x_shift"] = x_shift[:, : windows.shape[1]]
+            windows_batch["x_scale"] = x_scale[:, : windows.shape[1]]
+        return windows_batch
+
+    def _sample_windows(self, windows, w_idxs):
+        # Gather the windows w_idxs of the view, numbered serie by serie
+        # [batch, windows, window_size, channels] -> [len(w_idxs), window_size, channels]
+        windows_per_serie = windows["temporal"].shape[1]
+        w_idxs = torch.as_tensor(w_idxs, device=windows["temporal"].device)
+        serie_idxs = torch.div(w_idxs, windows_per_serie, rounding_mode="floor")
+        static = windows["static"]
+        if static is not None:
+            static = static[serie_idxs]
+
+        windows_batch = dict(
+            temporal=windows["temporal"][serie_idxs, w_idxs % windows_per_serie],
+            temporal_cols=windows["temporal_cols"],
+            static=static,
+            static_cols=windows["static_cols"],
+        )
+        if "x_shift" in windows:
+            windows_batch["x_shift"] = windows["x_shift"][
+                serie_idxs, w_idxs % windows_per_serie
+            ].unsqueeze(1)
+            windows_batch["x_scale"] = windows["x_scale"][
+                serie_idxs, w_idxs % windows_per_serie
+            ].unsqueeze(1)
+        return windows_batch
+
+    def _window_statistics(self, temporal, batch, step):
+        # Scaler statistics of the first input_size timestamps of every window of
+        # temporal [B, C, T], from the whole series instead of each window.
+        # Returns None when the scaler can't compute them this way.
+        if self.scaler.compute_window_statistics is None:
+            return None
+        schema = self._get_batch_schema(batch, batch["y_idx"])
+        return self.scaler.compute_window_statistics(
+            x=temporal[:, schema.scaled_idx].permute(0, 2, 1),
+            mask=temporal[:, [schema.mask_idx]].permute(0, 2, 1),
+            size=self.input_size,
+            step=step,
+            eps=self.scaler.eps,
+        )
 
     def _normalization(self, windows, y_idx):
         # windows are already filtered by train/validation/test
         # from the `create_windows_method` nor leakage risk
         temporal = windows["temporal"]  # B, L+H, C
-        temporal_cols = windows["temporal_cols"].copy()  # B, L+H, C
-
         # To avoid leakage uses only the lags
-        # temporal_data_cols = temporal_cols.drop('available_mask').tolist()
-        temporal_data_cols = self._get_temporal_exogenous_cols(
-            temporal_cols=temporal_cols
-        )
-        temporal_idxs = get_indexer_raise_missing(temporal_cols, temporal_data_cols)
-        temporal_idxs = np.append(y_idx, temporal_idxs)
+        schema = self._get_batch_schema(windows, y_idx)
+        temporal_idxs = schema.scaled_idx
+
+        if self.scaler.scaler_type in [None, "identity"]:
+            # The data doesn't change, only set the statistics used by _inv_normalization
+            shape = (temporal.shape[0], 1, len(temporal_idxs))
+            self.scaler.x_shift = torch.zeros(shape, device=temporal.device)
+            self.scaler.x_scale = torch.ones(shape, device=temporal.device)
+            return windows
+
         temporal_data = temporal[:, :, temporal_idxs]
-        temporal_mask = temporal[:, :, temporal_cols.get_loc("available_mask")].clone()
-        if self.h > 0:
-            temporal_mask[:, -self.h :] = 0.0
+        if "x_shift" in windows:
+            # Statistics computed by _window_statistics
+            temporal_data = self.scaler.transform(
+                x=temporal_data,
+                mask=None,
+                x_shift=windows["x_shift"],
+                x_scale=windows["x_scale"],
+            )
+        else:
+            temporal_mask = temporal[:, :, schema.mask_idx].clone()
+            if self.h > 0:
+                temporal_mask[:, -self.h :] = 0.0
 
-        # Normalize. self.scaler stores the shift and scale for inverse transform
-        temporal_mask = temporal_mask.unsqueeze(
-            -1
-        )  # Add channel dimension for scaler.transform.
-        temporal_data = self.scaler.transform(x=temporal_data, mask=temporal_mask)
+            # Normalize. self.scaler stores the shift and scale for inverse transform
+            temporal_mask = temporal_mask.unsqueeze(
+                -1
+            )  # Add channel dimension for scaler.transform.
+            temporal_data = self.scaler.transform(x=temporal_data, mask=temporal_mask)
 
         # Replace values in windows dict
         temporal[:, :, temporal_idxs] = temporal_data
@@ -339,7 +428,8 @@ class BaseWindows(BaseModel):
     def _parse_windows(self, batch, windows):
         # Filter insample lags from outsample horizon
         y_idx = batch["y_idx"]
-        mask_idx = batch["temporal_cols"].get_loc("available_mask")
+        schema = self._get_batch_schema(windows, y_idx)
+        mask_idx = schema.mask_idx
 
         insample_y = windows["temporal"][:, : self.input_size, y_idx]
         insample_mask = windows["temporal"][:, : self.input_size, mask_idx]
@@ -356,22 +446,13 @@ class BaseWindows(BaseModel):
             outsample_mask = windows["temporal"][:, self.input_size :, mask_idx]
 
         if len(self.hist_exog_list):
-            hist_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.hist_exog_list
-            )
-            hist_exog = windows["temporal"][:, : self.input_size, hist_exog_idx]
+            hist_exog = windows["temporal"][:, : self.input_size, schema.hist_exog_idx]
 
         if len(self.futr_exog_list):
-            futr_exog_idx = get_indexer_raise_missing(
-                windows["temporal_cols"], self.futr_exog_list
-            )
-            futr_exog = windows["temporal"][:, :, futr_exog_idx]
+            futr_exog = windows["temporal"][:, :, schema.futr_exog_idx]
 
         if len(self.stat_exog_list):
-            static_idx = get_indexer_raise_missing(
-                windows["static_cols"], self.stat_exog_list
-            )
-            stat_exog = windows["static"][:, static_idx]
+            stat_exog = windows["static"][:, schema.stat_exog_idx]
 
         # TODO: think a better way of removing insample_y features
         if self.exclude_insample_y:
@@ -388,12 +469,19 @@ class BaseWindows(BaseModel):
         )
 
     def training_step(self, batch, batch_idx):
+        windows, original_outsample_y = self._training_windows(batch)
+        return self._training_loss(batch, windows, original_outsample_y)
+
+    def _training_windows(self, batch):
         # Create and normalize windows [Ws, L+H, C]
         windows = self._create_windows(batch, step="train")
         y_idx = batch["y_idx"]
         original_outsample_y = torch.clone(windows["temporal"][:, -self.h :, y_idx])
         windows = self._normalization(windows=windows, y_idx=y_idx)
+        return windows, original_outsample_y
 
+    def _training_loss(self, batch, windows, original_outsample_y):
+        y_idx = batch["y_idx"]
         # Parse windows
         (
             insample_y,
@@ -414,7 +502,7 @@ class BaseWindows(BaseModel):
         )  # [Ws, 1]
 
         # Model Predictions
-        output = self(windows_batch)
+        output = self._forward(windows_batch)
         if self.loss.is_distribution_output:
             _, y_loc, y_scale = self._inv_normalization(
                 y_hat=outsample_y, temporal_cols=batch["temporal_cols"], y_idx=y_idx
@@ -478,9 +566,9 @@ class BaseWindows(BaseModel):
         if self.val_size == 0:
             return np.nan
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="val")
-        n_windows = len(windows["temporal"])
+        # Windows are created once as a view, each sub-batch gathers its own
+        all_windows = self._create_windows_view(batch, step="val")
+        n_windows = all_windows["temporal"].shape[0] * all_windows["temporal"].shape[1]
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -496,7 +584,7 @@ class BaseWindows(BaseModel):
             w_idxs = np.arange(
                 i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
             )
-            windows = self._create_windows(batch, step="val", w_idxs=w_idxs)
+            windows = self._sample_windows(all_windows, w_idxs)
             original_outsample_y = torch.clone(windows["temporal"][:, -self.h :, y_idx])
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
@@ -519,7 +607,7 @@ class BaseWindows(BaseModel):
             )  # [Ws, 1]
 
             # Model Predictions
-            output_batch = self(windows_batch)
+            output_batch = self._forward(windows_batch)
             valid_loss_batch = self._compute_valid_loss(
                 outsample_y=original_outsample_y,
                 output=output_batch,
@@ -543,9 +631,9 @@ class BaseWindows(BaseModel):
 
     def predict_step(self, batch, batch_idx):
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="predict")
-        n_windows = len(windows["temporal"])
+        # Windows are created once as a view, each sub-batch gathers its own
+        all_windows = self._create_windows_view(batch, step="predict")
+        n_windows = all_windows["temporal"].shape[0] * all_windows["temporal"].shape[1]
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -560,7 +648,7 @@ class BaseWindows(BaseModel):
             w_idxs = np.arange(
                 i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
             )
-            windows = self._create_windows(batch, step="predict", w_idxs=w_idxs)
+            windows = self._sample_windows(all_windows, w_idxs)
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
             # Parse windows
@@ -576,7 +664,7 @@ class BaseWindows(BaseModel):
             )  # [Ws, 1]
 
             # Model Predictions
-            output_batch = self(windows_batch)
+            output_batch = self._forward(windows_batch)
             # Inverse normalization and sampling
             if self.loss.is_distribution_output:
                 _, y_loc, y_scale = self._inv_normalization(
@@ -630,13 +718,93 @@ class BaseWindows(BaseModel):
         """
         return self._fit(
             dataset=dataset,
-            batch_size=self.batch_size,
-            valid_batch_size=self.valid_batch_size,
             val_size=val_size,
             test_size=test_size,
             random_seed=random_seed,
+            **self._datamodule_kwargs(),
         )
 
+    def _datamodule_kwargs(self):
+        return dict(
+            batch_size=self.batch_size,
+            valid_batch_size=self.valid_batch_size,
+            bucket_by_length=self.bucket_by_length,
+            # windows can start up to input_size - 1 steps before a series
+            bucket_padding=0 if self.start_padding_enabled else self.input_size - 1,
+            device_batches=self.device_batches,
+        )
+
+    def _shared_windows_key(self):
+        # Models with the same key are fitted together by `_fit_shared_windows`, None
+        # for models trained by the trainer or creating their own training windows
+        if (
+            not self.lightweight_trainer
+            or self.scaler.scaler_type == "revin"
+            or type(self).training_step is not BaseWindows.training_step
+            or type(self)._training_windows is not BaseWindows._training_windows
+        ):
+            return None
+        return (
+            self.input_size,
+            self.h,
+            self.step_size,
+            self.windows_batch_size,
+            self.start_padding_enabled,
+            self.scaler.scaler_type,
+            _lightweight_device(self.trainer_kwargs),
+            tuple(self.hist_exog_list),
+            tuple(self.futr_exog_list),
+            tuple(self.stat_exog_list),
+            self.batch_size,
+            self.num_workers_loader,
+            self.drop_last_loader,
+            self.bucket_by_length,
+            self.device_batches,
+        )
+
+    def _fit_shared_windows(
+        self, models, dataset, val_size=0, test_size=0, random_seed=None
+    ):
+        """Fit `models`, this one among them, on the same training windows.
+
+        The windows of every step are created and normalized once, by this model, and
+        every model takes its training step on them with the lightweight training loop,
+        each with its own optimizer, validation and early stopping. The models need
+        the same `_shared_windows_key`.
+        """
+        # this model is seeded last, so it samples the windows like in its own fit
+        fits = []
+        for model in [model for model in models if model is not self] + [self]:
+            datamodule = model._prepare_fit(
+                dataset=dataset,
+                val_size=val_size,
+                test_size=test_size,
+                random_seed=random_seed,
+                **model._datamodule_kwargs(),
+            )
+            fits.append(_LightweightFit(model, datamodule))
+        active_fits = [fit for fit in fits if not fit.done]
+        try:
+            while active_fits:
+                for batch in datamodule.train_dataloader():
+                    batch = self._transfer_batch(datamodule, batch)
+                    windows, original_outsample_y = self._training_windows(batch)
+                    for fit in active_fits:
+                        # statistics of the windows for _inv_normalization
+                        fit.model.scaler.x_shift = self.scaler.x_shift
+                        fit.model.scaler.x_scale = self.scaler.x_scale
+                        fit.step(
+                            fit.model._training_loss(
+                                batch, windows, original_outsample_y
+                            )
+                        )
+                    active_fits = [fit for fit in active_fits if not fit.done]
+                    if not active_fits:
+                        break
+        finally:
+            for fit in fits:
+                fit.finish()
+
     def predict(
         self,
         dataset,
@@ -657,6 +825,7 @@ class BaseWindows(BaseModel):
         `**data_module_kwargs`: PL's TimeSeriesDataModule args, see [documentation](https://pytorch-lightning.readthedocs.io/en/1.6.1/extensions/datamodules.html#using-a-datamodule).
         """
         self._check_exog(dataset)
+        self._set_batch_schema(dataset)
         self._restart_seed(random_seed)
 
         self.predict_step_size = step_size
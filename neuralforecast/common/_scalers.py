@@ -2,7 +2,8 @@
 
 # %% auto 0
 __all__ = ['masked_median', 'masked_mean', 'minmax_statistics', 'minmax1_statistics', 'std_statistics', 'robust_statistics',
-           'invariant_statistics', 'identity_statistics', 'TemporalNorm']
+           'invariant_statistics', 'identity_statistics', 'window_std_statistics', 'window_minmax_statistics',
+           'TemporalNorm']
 
 # %% ../../nbs/common.scalers.ipynb 6
 import torch
@@ -327,6 +328,122 @@ def inv_identity_scaler(z, x_shift, x_scale):
     return z
 
 # %% ../../nbs/common.scalers.ipynb 33
+def _window_sums(x, size, step):
+    # Sums over dim 1 of the windows of `size` timestamps from the prefix sums of `x`
+    cumsum = nn.functional.pad(x.cumsum(dim=1), (0, 0, 1, 0))
+    starts = torch.arange(0, x.shape[1] - size + 1, step, device=x.device)
+    return cumsum[:, starts + size] - cumsum[:, starts]
+
+
+def _window_max(x, size, step):
+    # Maximum over dim 1 of the windows of `size` timestamps. Every window spans the
+    # suffix of a block of `size` timestamps and the prefix of the next one.
+    batch, time, channels = x.shape
+    n_blocks = -(-time // size)
+    x = nn.functional.pad(x, (0, 0, 0, n_blocks * size - time), value=-torch.inf)
+    blocks = x.reshape(batch, n_blocks, size, channels)
+    prefix = blocks.cummax(dim=2).values.reshape(batch, -1, channels)
+    suffix = blocks.flip(2).cummax(dim=2).values.flip(2).reshape(batch, -1, channels)
+    starts = torch.arange(0, time - size + 1, step, device=x.device)
+    return torch.maximum(suffix[:, starts], prefix[:, starts + size - 1])
+
+
+def _constant_windows(x, valid, size, step):
+    # A window is constant when none of its valid values differs from the previous
+    # valid value, leaving out its first one which is compared with an earlier timestamp
+    time = x.shape[1]
+    positions = torch.arange(time, device=x.device).view(1, -1, 1)
+    last_valid = torch.where(valid, positions, -1).cummax(dim=1).values
+    prev_valid = nn.functional.pad(last_valid[:, :-1], (0, 0, 1, 0), value=-1)
+    prev_values = x.gather(1, prev_valid.clamp(min=0))
+    changes = valid & (prev_valid >= 0) & (x != prev_values)
+
+    next_valid = (
+        torch.where(valid, positions, time).flip(1).cummin(dim=1).values.flip(1)
+    )
+    starts = torch.arange(0, time - size + 1, step, device=x.device).view(1, -1, 1)
+    first_valid = next_valid[:, starts.flatten()]
+    first_changes = changes.gather(1, first_valid.clamp(max=time - 1)) & (
+        first_valid < starts + size
+    )
+    return (_window_sums(changes, size, step) - first_changes.long()) == 0
+
+# %% ../../nbs/common.scalers.ipynb 34
+def window_std_statistics(x, mask, size, step=1, eps=1e-6):
+    """Windowed Standard Scaler
+
+    Computes the `std_statistics` of every window of `size` timestamps along
+    the second dimension of `x`, with the windows starting every `step` timestamps.
+    The statistics come from the prefix sums of each serie, so the cost doesn't
+    depend on the size of the windows.
+
+    **Parameters:**<br>
+    `x`: torch.Tensor shape [batch, time, channels].<br>
+    `mask`: torch Tensor bool, broadcastable to `x`, indicates where `x` is valid and False
+            where `x` should be masked.<br>
+    `size`: int, number of timestamps of each window.<br>
+    `step` (int, optional): Distance between the starts of consecutive windows. Defaults to 1.<br>
+    `eps` (float, optional): Small value to avoid division by zero. Defaults to 1e-6.<br>
+
+    **Returns:**<br>
+    `x_means`, `x_stds`: torch.Tensor shape [batch, windows, channels].
+    """
+    valid = (mask > 0) & ~torch.isnan(x)
+    # The sums are accumulated in double precision, except on mps that doesn't support it,
+    # and each serie is centered to keep the differences of the prefix sums accurate
+    acc_dtype = torch.float32 if x.device.type == "mps" else torch.float64
+    x_valid = torch.where(valid, x, 0.0).to(acc_dtype)
+    x_center = x_valid.sum(dim=1, keepdim=True) / valid.sum(dim=1, keepdim=True).clamp(
+        min=1
+    )
+    x_valid = torch.where(valid, x_valid - x_center, 0.0)
+
+    counts = _window_sums(valid, size, step)
+    safe_counts = counts.clamp(min=1)
+    x_means = _window_sums(x_valid, size, step) / safe_counts
+    x_vars = (
+        _window_sums(x_valid**2, size, step) / safe_counts - x_means**2
+    ).clamp(min=0)
+    x_means = torch.where(counts > 0, x_means + x_center, 0.0)
+    x_stds = torch.sqrt(x_vars)
+
+    # Protect against division by zero, the rounding of the sums of constant windows is ignored
+    x_stds[(counts == 0) | _constant_windows(x, valid, size, step)] = 1.0
+    x_stds = x_stds + eps
+    return x_means.to(x.dtype), x_stds.to(x.dtype)
+
+
+def window_minmax_statistics(x, mask, size, step=1, eps=1e-6):
+    """Windowed MinMax Scaler
+
+    Computes the `minmax_statistics` of every window of `size` timestamps along
+    the second dimension of `x`, with the windows starting every `step` timestamps.
+    The extremes come from the running maximum and minimum of blocks of `size`
+    timestamps, so the cost doesn't depend on the size of the windows.
+
+    **Parameters:**<br>
+    `x`: torch.Tensor shape [batch, time, channels].<br>
+    `mask`: torch Tensor bool, broadcastable to `x`, indicates where `x` is valid and False
+            where `x` should be masked.<br>
+    `size`: int, number of timestamps of each window.<br>
+    `step` (int, optional): Distance between the starts of consecutive windows. Defaults to 1.<br>
+    `eps` (float, optional): Small value to avoid division by zero. Defaults to 1e-6.<br>
+
+    **Returns:**<br>
+    `x_min`, `x_range`: torch.Tensor shape [batch, windows, channels].
+    """
+    # Same masking as minmax_statistics
+    mask = torch.where(mask > 0, 0.0, torch.inf)
+    x_max = _window_max(torch.nan_to_num(x - mask, nan=-torch.inf), size, step)
+    x_min = -_window_max(-torch.nan_to_num(x + mask, nan=torch.inf), size, step)
+
+    # x_range and prevent division by zero
+    x_range = x_max - x_min
+    x_range[x_range == 0] = 1.0
+    x_range = x_range + eps
+    return x_min, x_range
+
+# %% ../../nbs/common.scalers.ipynb 38
 class TemporalNorm(nn.Module):
     """Temporal Normalization
 
@@ -385,11 +502,19 @@ class TemporalNorm(nn.Module):
             "minmax1": inv_minmax1_scaler,
             "invariant": inv_invariant_scaler,
         }
+        # Statistics of all the windows of a serie at once, see window_std_statistics
+        compute_window_statistics = {
+            "standard": window_std_statistics,
+            "revin": window_std_statistics,
+            "minmax": window_minmax_statistics,
+            "minmax1": window_minmax_statistics,
+        }
         assert scaler_type in scalers.keys(), f"{scaler_type} not defined"
         if (scaler_type == "revin") and (num_features is None):
             raise Exception("You must pass num_features for ReVIN scaler.")
 
         self.compute_statistics = compute_statistics[scaler_type]
+        self.compute_window_statistics = compute_window_statistics.get(scaler_type)
         self.scaler = scalers[scaler_type]
         self.inverse_scaler = inverse_scalers[scaler_type]
         self.scaler_type = scaler_type
@@ -409,7 +534,7 @@ class TemporalNorm(nn.Module):
             self.revin_weight = nn.Parameter(torch.ones(1, num_features, 1))
 
     # @torch.no_grad()
-    def transform(self, x, mask):
+    def transform(self, x, mask, x_shift=None, x_scale=None):
         """Center and scale the data.
 
         **Parameters:**<br>
@@ -417,13 +542,16 @@ class TemporalNorm(nn.Module):
         `mask`: torch Tensor bool, shape  [batch, time] where `x` is valid and False
                 where `x` should be masked. Mask should not be all False in any column of
                 dimension dim to avoid NaNs from zero division.<br>
+        `x_shift`: torch.Tensor=None, precomputed shift, e.g. by `compute_window_statistics`, `mask` is then ignored.<br>
+        `x_scale`: torch.Tensor=None, precomputed scale, used with `x_shift`.<br>
 
         **Returns:**<br>
         `z`: torch.Tensor same shape as `x`, except scaled.
         """
-        x_shift, x_scale = self.compute_statistics(
-            x=x, mask=mask, dim=self.dim, eps=self.eps
-        )
+        if x_shift is None:
+            x_shift, x_scale = self.compute_statistics(
+                x=x, mask=mask, dim=self.dim, eps=self.eps
+            )
         self.x_shift = x_shift
         self.x_scale = x_scale
 
@@ -7,6 +7,7 @@ __all__ = ['NeuralForecast']
 import os
 import pickle
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from itertools import chain
 from typing import Any, Dict, List, Optional, Union
@@ -26,7 +27,11 @@ from coreforecast.scalers import (
 from utilsforecast.compat import DataFrame, Series, pl_DataFrame, pl_Series
 from utilsforecast.validation import validate_freq
 
-from .tsdataset import TimeSeriesDataset
+from neuralforecast.common._base_model import (
+    _fit_predict_group,
+    _fit_predict_in_process,
+)
+from .tsdataset import TimeSeriesDataset, MemmapTimeSeriesDataset
 from neuralforecast.models import (
     GRU,
     LSTM,
@@ -173,6 +178,12 @@ _type2scaler = {
     "boxcox": lambda: LocalBoxCoxScaler(method="loglik", lower=0.0),
 }
 
+_storage_dtypes = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
 # %% ../nbs/core.ipynb 9
 def _id_as_idx() -> bool:
     return not bool(os.getenv("NIXTLA_ID_AS_COL", ""))
@@ -194,6 +205,10 @@ class NeuralForecast:
         models: List[Any],
         freq: Union[str, int],
         local_scaler_type: Optional[str] = None,
+        storage_dtype: str = "float32",
+        n_jobs: int = 1,
+        threads_per_job: Optional[int] = None,
+        share_windows: bool = False,
     ):
         """
         The `core.StatsForecast` class allows you to efficiently fit multiple `NeuralForecast` models
@@ -211,6 +226,22 @@ class NeuralForecast:
         local_scaler_type : str, optional (default=None)
             Scaler to apply per-serie to all features before fitting, which is inverted after predicting.
             Can be 'standard', 'robust', 'robust-iqr', 'minmax' or 'boxcox'
+        storage_dtype : str (default='float32')
+            Dtype of the temporal and static data kept in memory and saved with the dataset.
+            Can be 'float32', 'float16' or 'bfloat16', the models upcast each batch to float32.
+        n_jobs : int (default=1)
+            Number of processes that fit the models in parallel, in `fit` and `cross_validation`, `predict` runs in this process.
+            The processes are started with the `spawn` method, so the script that fits the models must guard its entry point
+            with `if __name__ == "__main__":`. They are started for every fit and the dataset built by `fit` is moved to shared
+            memory, so they don't copy it. The auto models and `HINT` are fitted in this process while the others run.
+            The models fitted in parallel only log to the `logger` of their trainer arguments, if any.
+        threads_per_job : int, optional (default=None)
+            Number of threads of each process, by default the threads of torch divided by `n_jobs`.
+        share_windows : bool (default=False)
+            Fit together the windows-based models with `lightweight_trainer=True` and the same windows settings
+            (`input_size`, `windows_batch_size`, `batch_size`, `scaler_type`, exogenous features, ...).
+            The training windows of each step are created and normalized once and every model of the group trains on them.
+            The other models, the auto models and `HINT` included, are fitted on their own.
 
         Returns
         -------
@@ -227,6 +258,16 @@ class NeuralForecast:
         if local_scaler_type is not None and local_scaler_type not in _type2scaler:
             raise ValueError(f"scaler_type must be one of {_type2scaler.keys()}")
         self.local_scaler_type = local_scaler_type
+        if storage_dtype not in _storage_dtypes:
+            raise ValueError(
+                f"storage_dtype must be one of {list(_storage_dtypes.keys())}"
+            )
+        self.storage_dtype = storage_dtype
+        if n_jobs < 1:
+            raise ValueError("n_jobs must be a positive integer")
+        self.n_jobs = n_jobs
+        self.threads_per_job = threads_per_job
+        self.share_windows = share_windows
         self.scalers_: Dict
 
         # Flags and attributes
@@ -271,40 +312,108 @@ class NeuralForecast:
         self.id_col = id_col
         self.time_col = time_col
         self.target_col = target_col
-        self._check_nan(df, static_df, id_col, time_col, target_col)
+        if isinstance(df, MemmapTimeSeriesDataset):
+            # the files are mapped copy-on-write, scaling them in place would load the panel in memory
+            if self.local_scaler_type is not None:
+                raise ValueError(
+                    "`local_scaler_type` is not supported with `MemmapTimeSeriesDataset`, "
+                    "scale the data before building the dataset."
+                )
+            if static_df is not None:
+                raise ValueError(
+                    "Pass `static_df` when building the `MemmapTimeSeriesDataset`."
+                )
+            if self.storage_dtype != "float32":
+                raise ValueError(
+                    "`storage_dtype` is not supported with `MemmapTimeSeriesDataset`."
+                )
+            dataset, uids, last_dates, ds = df, df.uids, df.last_dates, df.ds
+        else:
+            # only the columns used by the models are converted
+            exog_cols, stat_exog_cols = self._get_needed_exog()
+            if isinstance(df, (pd.DataFrame, pl_DataFrame)):
+                self._check_nan(
+                    df,
+                    static_df,
+                    id_col,
+                    time_col,
+                    target_col,
+                    exog_cols,
+                    stat_exog_cols,
+                )
 
-        dataset, uids, last_dates, ds = TimeSeriesDataset.from_df(
-            df=df,
-            static_df=static_df,
-            sort_df=sort_df,
-            id_col=id_col,
-            time_col=time_col,
-            target_col=target_col,
-        )
+            dataset, uids, last_dates, ds = TimeSeriesDataset.from_df(
+                df=df,
+                static_df=static_df,
+                sort_df=sort_df,
+                id_col=id_col,
+                time_col=time_col,
+                target_col=target_col,
+                exog_cols=exog_cols,
+                stat_exog_cols=stat_exog_cols,
+            )
+            if not isinstance(df, (pd.DataFrame, pl_DataFrame)):
+                # partitions are only checked once they're loaded
+                self._check_nan(
+                    dataset,
+                    static_df,
+                    id_col,
+                    time_col,
+                    target_col,
+                    exog_cols,
+                    stat_exog_cols,
+                )
         if predict_only:
             self._scalers_transform(dataset)
         else:
             self._scalers_fit_transform(dataset)
+        if self.storage_dtype != "float32":
+            dataset._set_dtype(_storage_dtypes[self.storage_dtype])
         return dataset, uids, last_dates, ds
 
-    def _check_nan(self, df, static_df, id_col, time_col, target_col):
+    def _check_nan(
+        self,
+        df,
+        static_df,
+        id_col,
+        time_col,
+        target_col,
+        exog_cols=None,
+        stat_exog_cols=None,
+    ):
         cols_with_nans = []
 
-        temporal_cols = [target_col] + [
-            c for c in df.columns if c not in (id_col, time_col, target_col)
-        ]
-        if "available_mask" in temporal_cols:
-            available_mask = df["available_mask"].to_numpy().astype(bool)
+        if isinstance(df, TimeSeriesDataset):
+            temporal = df.temporal.numpy()
+            available_mask = df._unpacked_mask()
+            if available_mask is None:
+                available_mask = np.full(temporal.shape[0], True)
+            for i, col in enumerate(df.temporal_cols[: temporal.shape[1]]):
+                if (np.isnan(temporal[:, i]) & available_mask).any():
+                    cols_with_nans.append(col)
         else:
-            available_mask = np.full(df.shape[0], True)
+            temporal_cols = [target_col] + [
+                c
+                for c in df.columns
+                if c not in (id_col, time_col, target_col)
+                and (exog_cols is None or c in exog_cols or c == "available_mask")
+            ]
+            if "available_mask" in df.columns:
+                available_mask = df["available_mask"].to_numpy().astype(bool)
+            else:
+                available_mask = np.full(df.shape[0], True)
 
-        df_to_check = ufp.filter_with_mask(df, available_mask)
-        for col in temporal_cols:
-            if ufp.is_nan_or_none(df_to_check[col]).any():
-                cols_with_nans.append(col)
+            df_to_check = ufp.filter_with_mask(df[temporal_cols], available_mask)
+            for col in temporal_cols:
+                if ufp.is_nan_or_none(df_to_check[col]).any():
+                    cols_with_nans.append(col)
 
         if static_df is not None:
-            for col in [x for x in static_df.columns if x != id_col]:
+            for col in [
+                x
+                for x in static_df.columns
+                if x != id_col and (stat_exog_cols is None or x in stat_exog_cols)
+            ]:
                 if ufp.is_nan_or_none(static_df[col]).any():
                     cols_with_nans.append(col)
 
@@ -313,7 +422,7 @@ class NeuralForecast:
 
     def fit(
         self,
-        df: Optional[DataFrame] = None,
+        df: Optional[Union[DataFrame, MemmapTimeSeriesDataset]] = None,
         static_df: Optional[DataFrame] = None,
         val_size: Optional[int] = 0,
         sort_df: bool = True,
@@ -322,6 +431,7 @@ class NeuralForecast:
         id_col: str = "unique_id",
         time_col: str = "ds",
         target_col: str = "y",
+        trim_history: bool = False,
     ) -> None:
         """Fit the core.NeuralForecast.
 
@@ -330,8 +440,9 @@ class NeuralForecast:
 
         Parameters
         ----------
-        df : pandas or polars DataFrame, optional (default=None)
+        df : pandas or polars DataFrame or MemmapTimeSeriesDataset, optional (default=None)
             DataFrame with columns [`unique_id`, `ds`, `y`] and exogenous variables.
+            It can also be an iterable of DataFrames or a directory with parquet files.
             If None, a previously stored dataset is required.
         static_df : pandas or polars DataFrame, optional (default=None)
             DataFrame with columns [`unique_id`] and static exogenous.
@@ -349,6 +460,9 @@ class NeuralForecast:
             Column that identifies each timestep, its values can be timestamps or integers.
         target_col : str (default='y')
             Column that contains the target.
+        trim_history : bool (default=False)
+            After training, keep only the last timestamps of each serie that the models read when predicting.
+            The stored dataset is then used by `predict`, `predict_insample` and `save` with that tail only.
 
         Returns
         -------
@@ -366,7 +480,8 @@ class NeuralForecast:
 
         # Process and save new dataset (in self)
         if df is not None:
-            validate_freq(df[time_col], self.freq)
+            if isinstance(df, (pd.DataFrame, pl_DataFrame)):
+                validate_freq(df[time_col], self.freq)
             self.dataset, self.uids, self.last_dates, self.ds = self._prepare_fit(
                 df=df,
                 static_df=static_df,
@@ -391,10 +506,42 @@ class NeuralForecast:
         if use_init_models:
             self._reset_models()
 
-        for model in self.models:
-            model.fit(self.dataset, val_size=val_size)
+        self._fit_predict_models(self.dataset, fit_kwargs=dict(val_size=val_size))
 
         self._fitted = True
+        if trim_history:
+            self._trim_history()
+
+    def _get_max_lookback(self) -> Optional[int]:
+        """Timestamps of each serie read by the models when predicting, None if they use the whole history."""
+        lookbacks = []
+        for model in self.models:
+            # auto models and HINT predict with the model they wrap
+            model = getattr(model, "model", model)
+            if hasattr(model, "inference_input_size"):
+                # recurrent models normalize with the whole history
+                if model.inference_input_size <= 0 or model.scaler.scaler_type not in (
+                    None,
+                    "identity",
+                ):
+                    return None
+                # and read h more timestamps, the test size set by predict
+                lookbacks.append(model.inference_input_size + model.h)
+            else:
+                lookbacks.append(model.input_size)
+        return max(lookbacks)
+
+    def _trim_history(self) -> None:
+        lookback = self._get_max_lookback()
+        if lookback is None:
+            warnings.warn(
+                "Some models use the whole history to predict, the stored dataset is kept."
+            )
+            return
+        if self.dataset.max_size <= lookback:
+            return
+        self.dataset, rows = self.dataset._keep_last(lookback)
+        self.ds = self.ds[rows]
 
     def make_future_dataframe(self, df: Optional[DataFrame] = None) -> DataFrame:
         """Create a dataframe with all ids and future times in the forecasting horizon.
@@ -451,6 +598,22 @@ class NeuralForecast:
             chain.from_iterable(getattr(m, "futr_exog_list", []) for m in self.models)
         )
 
+    def _get_needed_exog(self):
+        """Temporal and static exogenous columns used by the models.
+
+        Returns `(None, None)` when a model only knows them after fitting (e.g. the auto models),
+        in which case every column is kept."""
+        exog_lists = ("futr_exog_list", "hist_exog_list", "stat_exog_list")
+        if not all(hasattr(m, attr) for m in self.models for attr in exog_lists):
+            return None, None
+        exog_cols = set(
+            chain.from_iterable(
+                m.futr_exog_list + m.hist_exog_list for m in self.models
+            )
+        )
+        stat_exog_cols = set(chain.from_iterable(m.stat_exog_list for m in self.models))
+        return exog_cols, stat_exog_cols
+
     def predict(
         self,
         df: Optional[DataFrame] = None,
@@ -466,8 +629,9 @@ class NeuralForecast:
 
         Parameters
         ----------
-        df : pandas or polars DataFrame, optional (default=None)
+        df : pandas or polars DataFrame or MemmapTimeSeriesDataset, optional (default=None)
             DataFrame with columns [`unique_id`, `ds`, `y`] and exogenous variables.
+            It can also be an iterable of DataFrames or a directory with parquet files.
             If a DataFrame is passed, it is used to generate forecasts.
         static_df : pandas or polars DataFrame, optional (default=None)
             DataFrame with columns [`unique_id`] and static exogenous.
@@ -508,7 +672,8 @@ class NeuralForecast:
 
         # Process new dataset but does not store it.
         if df is not None:
-            validate_freq(df[self.time_col], self.freq)
+            if isinstance(df, (pd.DataFrame, pl_DataFrame)):
+                validate_freq(df[self.time_col], self.freq)
             dataset, uids, last_dates, _ = self._prepare_fit(
                 df=df,
                 static_df=static_df,
@@ -574,16 +739,20 @@ class NeuralForecast:
             target_col=self.target_col,
         )
         self._scalers_transform(futr_dataset)
-        dataset = dataset.append(futr_dataset)
+        dataset = dataset.append_view(futr_dataset)
+
+        old_test_sizes = [model.get_test_size() for model in self.models]
+        for model in self.models:
+            model.set_test_size(self.h)  # To predict h steps ahead
+        models_fcsts = self._fit_predict_models(dataset, predict_kwargs=data_kwargs)
 
         col_idx = 0
         fcsts = np.full(
             (self.h * len(uids), len(cols)), fill_value=np.nan, dtype=np.float32
         )
-        for model in self.models:
-            old_test_size = model.get_test_size()
-            model.set_test_size(self.h)  # To predict h steps ahead
-            model_fcsts = model.predict(dataset=dataset, **data_kwargs)
+        for model, model_fcsts, old_test_size in zip(
+            self.models, models_fcsts, old_test_sizes
+        ):
             # Append predictions in memory placeholder
             output_length = len(model.loss.output_names)
             fcsts[:, col_idx : col_idx + output_length] = model_fcsts
@@ -604,6 +773,85 @@ class NeuralForecast:
             fcsts_df = fcsts_df.set_index(self.id_col)
         return fcsts_df
 
+    def _fit_predict_models(self, dataset, fit_kwargs=None, predict_kwargs=None):
+        """Fit and/or predict every model, fitting in a pool of `n_jobs` processes. Returns their forecasts."""
+        groups = self._model_groups()
+        # predicting takes less than starting the processes, it runs in this one,
+        # and so do the auto models and HINT, which can't be sent to other processes
+        pooled = []
+        if self.n_jobs > 1 and fit_kwargs is not None:
+            pooled = [
+                k
+                for k, group in enumerate(groups)
+                if hasattr(self.models[group[0]], "trainer_kwargs")
+            ]
+        futures = {}
+        pool = None
+        if pooled:
+            n_threads = self.threads_per_job
+            if n_threads is None:
+                n_threads = max(1, torch.get_num_threads() // self.n_jobs)
+            # the dataset was built by fit, the processes receive handles to its data instead of copies of it
+            dataset._share_memory()
+            # the workers aren't daemonic, so the loaders of the models can start their own workers
+            ctx = torch.multiprocessing.get_context("spawn")
+            pool = ProcessPoolExecutor(min(self.n_jobs, len(pooled)), mp_context=ctx)
+            for k in pooled:
+                futures[k] = pool.submit(
+                    _fit_predict_in_process,
+                    [self.models[i] for i in groups[k]],
+                    dataset,
+                    n_threads,
+                    fit_kwargs,
+                    predict_kwargs,
+                )
+        try:
+            # the other models are fitted here while the processes run
+            local = {
+                k: (
+                    None,
+                    _fit_predict_group(
+                        [self.models[i] for i in group],
+                        dataset,
+                        fit_kwargs,
+                        predict_kwargs,
+                    ),
+                )
+                for k, group in enumerate(groups)
+                if k not in futures
+            }
+            results = [
+                local[k] if k in local else futures[k].result()
+                for k in range(len(groups))
+            ]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self._ungroup_results(groups, results)
+
+    def _model_groups(self):
+        """Indices of the models fitted together, on the same training windows with `share_windows`."""
+        if not self.share_windows:
+            return [[i] for i in range(len(self.models))]
+        groups = {}
+        for i, model in enumerate(self.models):
+            # the auto models and HINT are fitted on their own
+            key = getattr(model, "_shared_windows_key", lambda: None)()
+            groups.setdefault(i if key is None else key, []).append(i)
+        return list(groups.values())
+
+    def _ungroup_results(self, groups, results):
+        """Forecasts of the groups in the order of the models, replaces the models fitted in other processes."""
+        models_fcsts = [None] * len(self.models)
+        for group, (models, fcsts) in zip(groups, results):
+            for j, i in enumerate(group):
+                if models is not None:
+                    self.models[i] = models[j]
+                if fcsts:
+                    models_fcsts[i] = fcsts[j]
+        # only fitting returns no forecasts
+        return [fcsts for fcsts in models_fcsts if fcsts is not None]
+
     def _reset_models(self):
         self.models = [deepcopy(model) for model in self.models_init]
         if self._fitted:
@@ -629,7 +877,8 @@ class NeuralForecast:
 
         # Process and save new dataset (in self)
         if df is not None:
-            validate_freq(df[time_col], self.freq)
+            if isinstance(df, (pd.DataFrame, pl_DataFrame)):
+                validate_freq(df[time_col], self.freq)
             self.dataset, self.uids, self.last_dates, self.ds = self._prepare_fit(
                 df=df,
                 static_df=static_df,
@@ -679,12 +928,12 @@ class NeuralForecast:
             dtype=np.float32,
         )
 
-        for model in self.models:
-            model.fit(dataset=self.dataset, val_size=val_size, test_size=test_size)
-            model_fcsts = model.predict(
-                self.dataset, step_size=step_size, **data_kwargs
-            )
-
+        models_fcsts = self._fit_predict_models(
+            self.dataset,
+            fit_kwargs=dict(val_size=val_size, test_size=test_size),
+            predict_kwargs=dict(step_size=step_size, **data_kwargs),
+        )
+        for model, model_fcsts in zip(self.models, models_fcsts):
             # Append predictions in memory placeholder
             output_length = len(model.loss.output_names)
             fcsts[:, col_idx : (col_idx + output_length)] = model_fcsts
@@ -705,6 +954,19 @@ class NeuralForecast:
         fcsts_df = ufp.horizontal_concat([fcsts_df, fcsts])
 
         # Add original input df's y to forecasts DataFrame
+        if not isinstance(df, (pd.DataFrame, pl_DataFrame)):
+            y = self.dataset.temporal[:, [self.dataset.y_idx]].float().numpy()
+            original_y = {
+                id_col: ufp.repeat(self.uids, np.diff(self.dataset.indptr)),
+                time_col: self.ds,
+                target_col: self._scalers_target_inverse_transform(
+                    y, self.dataset.indptr
+                )[:, 0],
+            }
+            if isinstance(self.uids, pl_Series):
+                df = pl_DataFrame(original_y)
+            else:
+                df = pd.DataFrame(original_y)
         fcsts_df = ufp.join(
             fcsts_df,
             df[[id_col, time_col, target_col]],
@@ -718,7 +980,7 @@ class NeuralForecast:
 
     def cross_validation(
         self,
-        df: Optional[DataFrame] = None,
+        df: Optional[Union[DataFrame, MemmapTimeSeriesDataset]] = None,
         static_df: Optional[DataFrame] = None,
         n_windows: int = 1,
         step_size: int = 1,
@@ -740,8 +1002,9 @@ class NeuralForecast:
 
         Parameters
         ----------
-        df : pandas or polars DataFrame, optional (default=None)
+        df : pandas or polars DataFrame or MemmapTimeSeriesDataset, optional (default=None)
             DataFrame with columns [`unique_id`, `ds`, `y`] and exogenous variables.
+            It can also be an iterable of DataFrames or a directory with parquet files.
             If None, a previously stored dataset is required.
         static_df : pandas or polars DataFrame, optional (default=None)
             DataFrame with columns [`unique_id`] and static exogenous.
@@ -815,6 +1078,8 @@ class NeuralForecast:
             )
         if df is None:
             raise ValueError("Must specify `df` with `refit!=False`.")
+        if not isinstance(df, (pd.DataFrame, pl_DataFrame)):
+            raise ValueError("Only DataFrames are supported with `refit!=False`.")
         validate_freq(df[time_col], self.freq)
         splits = ufp.backtest_splits(
             df,
@@ -971,7 +1236,7 @@ class NeuralForecast:
         original_y = {
             self.id_col: ufp.repeat(self.uids, np.diff(self.dataset.indptr)),
             self.time_col: self.ds,
-            self.target_col: self.dataset.temporal[:, 0].numpy(),
+            self.target_col: self.dataset.temporal[:, 0].float().numpy(),
         }
 
         # Add predictions to forecasts DataFrame
@@ -1019,6 +1284,7 @@ class NeuralForecast:
             List to specify which models from list of self.models to save.
         save_dataset : bool (default=True)
             Whether to save dataset or not.
+            The files of a `MemmapTimeSeriesDataset` are written to the `dataset` subdirectory and mapped again by `load`.
         overwrite : bool (default=False)
             Whether to overwrite files or not.
         """
@@ -1062,7 +1328,15 @@ class NeuralForecast:
                 pickle.dump(alias_to_model, f)
 
         # Save dataset
-        if (save_dataset) and (hasattr(self, "dataset")):
+        if (save_dataset) and isinstance(
+            getattr(self, "dataset", None), MemmapTimeSeriesDataset
+        ):
+            # a dataset loaded from the same directory is already there
+            if os.path.abspath(f"{path}/dataset") != self.dataset.path:
+                MemmapTimeSeriesDataset._write(
+                    f"{path}/dataset", self.dataset, self.uids, self.last_dates, self.ds
+                )
+        elif (save_dataset) and (hasattr(self, "dataset")):
             with fsspec.open(f"{path}/dataset.pkl", "wb") as f:
                 pickle.dump(self.dataset, f)
         elif save_dataset:
@@ -1081,6 +1355,10 @@ class NeuralForecast:
             "sort_df": self.sort_df,
             "_fitted": self._fitted,
             "local_scaler_type": self.local_scaler_type,
+            "storage_dtype": self.storage_dtype,
+            "n_jobs": self.n_jobs,
+            "threads_per_job": self.threads_per_job,
+            "share_windows": self.share_windows,
             "scalers_": self.scalers_,
             "id_col": self.id_col,
             "time_col": self.time_col,
@@ -1144,8 +1422,11 @@ class NeuralForecast:
             print(10 * "-" + " Loading dataset " + 10 * "-")
         # Load dataset
         try:
-            with fsspec.open(f"{path}/dataset.pkl", "rb") as f:
-                dataset = pickle.load(f)
+            if fs.isdir(f"{path}/dataset"):
+                dataset = MemmapTimeSeriesDataset(f"{path}/dataset")
+            else:
+                with fsspec.open(f"{path}/dataset.pkl", "rb") as f:
+                    dataset = pickle.load(f)
             if verbose:
                 print("Dataset loaded.")
         except FileNotFoundError:
@@ -1169,6 +1450,10 @@ class NeuralForecast:
             models=models,
             freq=config_dict["freq"],
             local_scaler_type=config_dict["local_scaler_type"],
+            storage_dtype=config_dict.get("storage_dtype", "float32"),
+            n_jobs=config_dict.get("n_jobs", 1),
+            threads_per_job=config_dict.get("threads_per_job", None),
+            share_windows=config_dict.get("share_windows", False),
         )
 
         for attr in ["id_col", "time_col", "target_col"]:
@@ -107,6 +107,8 @@ class BiTCN(BaseWindows):
     `random_seed`: int=1, random_seed for pytorch initializer and numpy generators.<br>
     `num_workers_loader`: int=os.cpu_count(), workers to be used by `TimeSeriesDataLoader`.<br>
     `drop_last_loader`: bool=False, if True `TimeSeriesDataLoader` drops last non-full batch.<br>
+    `bucket_by_length`: bool=False, if True `TimeSeriesDataLoader` groups series of similar length in the training batches and pads them to the longest series of each batch.<br>
+    `device_batches`: bool=False, if True the training series are kept on the training device and the batches are sampled there instead of by `TimeSeriesDataLoader`.<br>
     `alias`: str, optional,  Custom name of the model.<br>
     `optimizer`: Subclass of 'torch.optim.Optimizer', optional, user specified optimizer instead of the default choice (Adam).<br>
     `optimizer_kwargs`: dict, optional, list of parameters used by the user specified `optimizer`.<br>
@@ -144,6 +146,8 @@ class BiTCN(BaseWindows):
         random_seed: int = 1,
         num_workers_loader: int = 0,
         drop_last_loader: bool = False,
+        bucket_by_length: bool = False,
+        device_batches: bool = False,
         optimizer=None,
         optimizer_kwargs=None,
         **trainer_kwargs
@@ -172,6 +176,8 @@ class BiTCN(BaseWindows):
             random_seed=random_seed,
             num_workers_loader=num_workers_loader,
             drop_last_loader=drop_last_loader,
+            bucket_by_length=bucket_by_length,
+            device_batches=device_batches,
             optimizer=optimizer,
             optimizer_kwargs=optimizer_kwargs,
             **trainer_kwargs
@@ -86,6 +86,8 @@ class DeepAR(BaseWindows):
     `random_seed`: int, random_seed for pytorch initializer and numpy generators.<br>
     `num_workers_loader`: int=os.cpu_count(), workers to be used by `TimeSeriesDataLoader`.<br>
     `drop_last_loader`: bool=False, if True `TimeSeriesDataLoader` drops last non-full batch.<br>
+    `bucket_by_length`: bool=False, if True `TimeSeriesDataLoader` groups series of similar length in the training batches and pads them to the longest series of each batch.<br>
+    `device_batches`: bool=False, if True the training series are kept on the training device and the batches are sampled there instead of by `TimeSeriesDataLoader`.<br>
     `alias`: str, optional,  Custom name of the model.<br>
     `optimizer`: Subclass of 'torch.optim.Optimizer', optional, user specified optimizer instead of the default choice (Adam).<br>
     `optimizer_kwargs`: dict, optional, list of parameters used by the user specified `optimizer`.<br>
@@ -133,6 +135,8 @@ class DeepAR(BaseWindows):
         random_seed: int = 1,
         num_workers_loader=0,
         drop_last_loader=False,
+        bucket_by_length=False,
+        device_batches=False,
         optimizer=None,
         optimizer_kwargs=None,
         **trainer_kwargs
@@ -182,6 +186,8 @@ class DeepAR(BaseWindows):
             scaler_type=scaler_type,
             num_workers_loader=num_workers_loader,
             drop_last_loader=drop_last_loader,
+            bucket_by_length=bucket_by_length,
+            device_batches=device_batches,
             random_seed=random_seed,
             optimizer=optimizer,
             optimizer_kwargs=optimizer_kwargs,
@@ -252,7 +258,7 @@ class DeepAR(BaseWindows):
         )  # [Ws, 1]
 
         # Model Predictions
-        output = self.train_forward(windows_batch)
+        output = self._forward(windows_batch, forward=self.train_forward)
 
         if self.loss.is_distribution_output:
             _, y_loc, y_scale = self._inv_normalization(
@@ -291,9 +297,9 @@ class DeepAR(BaseWindows):
         if self.val_size == 0:
             return np.nan
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="val")
-        n_windows = len(windows["temporal"])
+        # Windows are created once as a view, each sub-batch gathers its own
+        all_windows = self._create_windows_view(batch, step="val")
+        n_windows = all_windows["temporal"].shape[0] * all_windows["temporal"].shape[1]
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -309,7 +315,7 @@ class DeepAR(BaseWindows):
             w_idxs = np.arange(
                 i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
             )
-            windows = self._create_windows(batch, step="val", w_idxs=w_idxs)
+            windows = self._sample_windows(all_windows, w_idxs)
             original_outsample_y = torch.clone(windows["temporal"][:, -self.h :, 0])
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
@@ -328,7 +334,7 @@ class DeepAR(BaseWindows):
             )
 
             # Model Predictions
-            output_batch = self(windows_batch)
+            output_batch = self._forward(windows_batch)
             # Monte Carlo already returns y_hat with mean and quantiles
             output_batch = output_batch[:, :, 1:]  # Remove mean
             valid_loss_batch = self.valid_loss(
@@ -352,9 +358,9 @@ class DeepAR(BaseWindows):
 
         self.h == self.horizon_backup
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="predict")
-        n_windows = len(windows["temporal"])
+        # Windows are created once as a view, each sub-batch gathers its own
+        all_windows = self._create_windows_view(batch, step="predict")
+        n_windows = all_windows["temporal"].shape[0] * all_windows["temporal"].shape[1]
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -369,7 +375,7 @@ class DeepAR(BaseWindows):
             w_idxs = np.arange(
                 i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
             )
-            windows = self._create_windows(batch, step="predict", w_idxs=w_idxs)
+            windows = self._sample_windows(all_windows, w_idxs)
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
             # Parse windows
@@ -386,7 +392,7 @@ class DeepAR(BaseWindows):
             )
 
             # Model Predictions
-            y_hat = self(windows_batch)
+            y_hat = self._forward(windows_batch)
             # Monte Carlo already returns y_hat with mean and quantiles
             y_hats.append(y_hat)
         y_hat = torch.cat(y_hats, dim=0)
@@ -474,7 +480,8 @@ class DeepAR(BaseWindows):
             # Decoder forward
             last_layer_h = h_n[-1]  # [B*trajectory_samples, lstm_hidden_state]
             output = self.decoder(last_layer_h)
-            output = self.loss.domain_map(output)
+            # The sampling runs in float32 when the decoder is autocast
+            output = self.loss.domain_map(output.float())
 
             # Inverse normalization
             distr_args = self.loss.scale_decouple(
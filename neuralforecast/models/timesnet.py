@@ -84,6 +84,7 @@ class TimesBlock(nn.Module):
                 length = (((self.input_size + self.h) // period) + 1) * period
                 padding = torch.zeros(
                     [x.shape[0], (length - (self.input_size + self.h)), x.shape[2]],
+                    dtype=x.dtype,
                     device=x.device,
                 )
                 out = torch.cat([x, padding], dim=1)
@@ -174,6 +175,10 @@ class TimesNet(BaseWindows):
         Workers to be used by `TimeSeriesDataLoader`.
     drop_last_loader : bool (default=False)
         If True `TimeSeriesDataLoader` drops last non-full batch.
+    bucket_by_length : bool (default=False)
+        If True `TimeSeriesDataLoader` groups series of similar length in the training batches and pads them to the longest series of each batch.
+    device_batches : bool (default=False)
+        If True the training series are kept on the training device and the batches are sampled there instead of by `TimeSeriesDataLoader`.
     `optimizer`: Subclass of 'torch.optim.Optimizer', optional (default=None)
         User specified optimizer instead of the default choice (Adam).
     `optimizer_kwargs`: dict, optional (defualt=None)
@@ -220,6 +225,8 @@ class TimesNet(BaseWindows):
         random_seed: int = 1,
         num_workers_loader: int = 0,
         drop_last_loader: bool = False,
+        bucket_by_length: bool = False,
+        device_batches: bool = False,
         optimizer=None,
         optimizer_kwargs=None,
         **trainer_kwargs
@@ -247,6 +254,8 @@ class TimesNet(BaseWindows):
             scaler_type=scaler_type,
             num_workers_loader=num_workers_loader,
             drop_last_loader=drop_last_loader,
+            bucket_by_length=bucket_by_length,
+            device_batches=device_batches,
             random_seed=random_seed,
             optimizer=optimizer,
             optimizer_kwargs=optimizer_kwargs,
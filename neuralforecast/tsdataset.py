@@ -1,19 +1,25 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/tsdataset.ipynb.
 
 # %% auto 0
-__all__ = ['TimeSeriesLoader', 'TimeSeriesDataset', 'TimeSeriesDataModule']
+__all__ = ['TimeSeriesLoader', 'TimeSeriesDataset', 'MemmapTimeSeriesDataset', 'TimeSeriesDataModule']
 
 # %% ../nbs/tsdataset.ipynb 4
+import os
+import pickle
+import tempfile
 import warnings
+import weakref
 from collections.abc import Mapping
+from typing import Optional
 
+import fsspec
 import numpy as np
 import pandas as pd
 import pytorch_lightning as pl
 import torch
 import utilsforecast.processing as ufp
-from torch.utils.data import Dataset, DataLoader
-from utilsforecast.compat import DataFrame, pl_Series
+from torch.utils.data import Dataset, DataLoader, Sampler
+from utilsforecast.compat import DataFrame, pl_DataFrame, pl_Series
 
 # %% ../nbs/tsdataset.ipynb 5
 class TimeSeriesLoader(DataLoader):
@@ -41,6 +47,23 @@ class TimeSeriesLoader(DataLoader):
         DataLoader.__init__(self, dataset=dataset, **kwargs_)
 
     def _collate_fn(self, batch):
+        if isinstance(batch, Mapping):
+            # Batch gathered by the dataset's `__getitems__`, only add the column metadata
+            if batch["static"] is None:
+                return dict(
+                    temporal=batch["temporal"],
+                    temporal_cols=self.dataset.temporal_cols,
+                    y_idx=self.dataset.y_idx,
+                )
+
+            return dict(
+                static=batch["static"],
+                static_cols=self.dataset.static_cols,
+                temporal=batch["temporal"],
+                temporal_cols=self.dataset.temporal_cols,
+                y_idx=self.dataset.y_idx,
+            )
+
         elem = batch[0]
         elem_type = type(elem)
 
@@ -73,6 +96,164 @@ class TimeSeriesLoader(DataLoader):
         raise TypeError(f"Unknown {elem_type}")
 
 # %% ../nbs/tsdataset.ipynb 7
+def _to_float32_block(df: DataFrame, cols, sort_idxs) -> np.ndarray:
+    """Fill a [n_rows, n_cols] float32 array one column at a time.
+
+    Only a single column is converted at any point, so the peak memory is the
+    final block plus one column instead of several copies of the whole panel."""
+    out = np.empty((df.shape[0], len(cols)), dtype=np.float32)
+    for j, col in enumerate(cols):
+        if isinstance(df, pd.DataFrame):
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.codes.to_numpy()
+            else:
+                values = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            values = ufp.to_numpy(df.select(col))[:, 0]
+        if sort_idxs is not None:
+            values = values[sort_idxs]
+        out[:, j] = values
+    return out
+
+
+def _value_cols(
+    columns, id_col: str, time_col: str, target_col: str, exog_cols=None
+) -> pd.Index:
+    """Target followed by the exogenous columns, restricted to `exog_cols` when given."""
+    exclude = (id_col, time_col, target_col, "available_mask")
+    return pd.Index(
+        [target_col]
+        + [
+            c
+            for c in columns
+            if c not in exclude and (exog_cols is None or c in exog_cols)
+        ]
+    )
+
+
+def _pack_mask(mask) -> torch.Tensor:
+    """Store a boolean mask with one bit per row."""
+    return torch.from_numpy(np.packbits(np.asarray(mask, dtype=bool)))
+
+
+def _unpack_mask(packed: torch.Tensor, rows: torch.Tensor) -> torch.Tensor:
+    """Values of the packed mask at `rows` as floats."""
+    shifts = 7 - (rows & 7)
+    return ((packed[rows >> 3] >> shifts) & 1).to(torch.float32)
+
+# %% ../nbs/tsdataset.ipynb 8
+class _Partitions:
+    """Panel split in several dataframes, either an iterable or a directory with parquet files.
+
+    The ids and times of every partition are kept to sort the rows, while the values
+    are converted to float32 one partition at a time. Directories are read twice
+    (ids and times first, values afterwards), so a single partition is loaded at once.
+    The `available_mask` column is kept apart from the values, as booleans. When `exog_cols`
+    is given the other exogenous columns are skipped, so they're never read from the files.
+    """
+
+    def __init__(
+        self, partitions, id_col: str, time_col: str, target_col: str, exog_cols=None
+    ):
+        self.exog_cols = exog_cols
+        keys = []
+        self.blocks = []
+        self.masks = []
+        if isinstance(partitions, (str, os.PathLike)):
+            import pyarrow.dataset as pa_ds
+
+            self.dataset = pa_ds.dataset(
+                partitions, format="parquet", partitioning="hive"
+            )
+            self.fragments: Optional[list] = list(self.dataset.get_fragments())
+            if not self.fragments:
+                raise ValueError(f"Found no parquet files in {partitions}.")
+            columns = self.dataset.schema.names
+            missing_cols = sorted({id_col, time_col, target_col} - set(columns))
+            if missing_cols:
+                raise ValueError(f"The following columns are missing: {missing_cols}")
+            self._set_columns(columns, id_col, time_col, target_col)
+            for fragment in self.fragments:
+                keys.append(self._read(fragment, [id_col, time_col]))
+        else:
+            self.fragments = None
+            for part in partitions:
+                ufp.validate_format(part, id_col, time_col, target_col)
+                if not keys:
+                    columns = list(part.columns)
+                    self._set_columns(columns, id_col, time_col, target_col)
+                elif set(part.columns) != set(columns):
+                    raise ValueError("All the partitions must have the same columns.")
+                keys.append(part[[id_col, time_col]])
+                self.blocks.append(_to_float32_block(part, self.value_cols, None))
+                if self.has_mask:
+                    self.masks.append(
+                        _to_float32_block(part, ["available_mask"], None)[:, 0].astype(
+                            bool
+                        )
+                    )
+            if not keys:
+                raise ValueError("Found no partitions.")
+        self.keys = ufp.vertical_concat(keys, match_categories=False)
+        ufp.validate_format(self.keys, id_col, time_col, None)
+
+    def _set_columns(self, columns, id_col, time_col, target_col):
+        self.value_cols = _value_cols(
+            columns, id_col, time_col, target_col, self.exog_cols
+        )
+        self.has_mask = "available_mask" in columns
+
+    def _read(self, fragment, columns):
+        return fragment.to_table(
+            columns=columns, schema=self.dataset.schema
+        ).to_pandas()
+
+    def _scatter(self, out, read_partition, sort_idxs):
+        n_rows = self.keys.shape[0]
+        if sort_idxs is not None:
+            # position of each original row in the sorted block
+            positions = np.empty_like(sort_idxs)
+            positions[sort_idxs] = np.arange(n_rows)
+        n_partitions = (
+            len(self.fragments) if self.fragments is not None else len(self.blocks)
+        )
+        offset = 0
+        for i in range(n_partitions):
+            block = read_partition(i)
+            rows = slice(offset, offset + block.shape[0])
+            if sort_idxs is None:
+                out[rows] = block
+            else:
+                out[positions[rows]] = block
+            offset += block.shape[0]
+        return out
+
+    def to_float32_block(self, sort_idxs) -> np.ndarray:
+        def read_partition(i):
+            if self.fragments is not None:
+                part = self._read(self.fragments[i], self.value_cols.tolist())
+                return _to_float32_block(part, self.value_cols, None)
+            block, self.blocks[i] = self.blocks[i], None
+            return block
+
+        out = np.empty((self.keys.shape[0], len(self.value_cols)), dtype=np.float32)
+        return self._scatter(out, read_partition, sort_idxs)
+
+    def to_mask(self, sort_idxs) -> np.ndarray:
+        def read_partition(i):
+            if self.fragments is not None:
+                part = self._read(self.fragments[i], ["available_mask"])
+                return _to_float32_block(part, ["available_mask"], None)[:, 0].astype(
+                    bool
+                )
+            mask, self.masks[i] = self.masks[i], None
+            return mask
+
+        out = np.empty(self.keys.shape[0], dtype=bool)
+        return self._scatter(out, read_partition, sort_idxs)
+
+# %% ../nbs/tsdataset.ipynb 9
 class TimeSeriesDataset(Dataset):
 
     def __init__(
@@ -86,13 +267,32 @@ class TimeSeriesDataset(Dataset):
         static=None,
         static_cols=None,
         sorted=False,
+        available_mask=None,
+        dtype=torch.float32,
     ):
         super().__init__()
-        self.temporal = torch.tensor(temporal, dtype=torch.float)
+        self.temporal = torch.as_tensor(temporal, dtype=dtype)
         self.temporal_cols = pd.Index(list(temporal_cols))
+        if "available_mask" in self.temporal_cols and self.temporal.shape[1] == len(
+            self.temporal_cols
+        ):
+            # Move the available_mask out of the temporal data
+            mask_idx = self.temporal_cols.get_loc("available_mask")
+            value_idxs = [i for i in range(len(self.temporal_cols)) if i != mask_idx]
+            available_mask = self.temporal[:, mask_idx].numpy().astype(bool)
+            self.temporal = self.temporal[:, value_idxs]
+            self.temporal_cols = self.temporal_cols[value_idxs].append(
+                pd.Index(["available_mask"])
+            )
+        # The last column (available_mask) is stored apart with one bit per row,
+        # or not at all when all its values are 1
+        if available_mask is not None and not np.all(available_mask):
+            self.available_mask: Optional[torch.Tensor] = _pack_mask(available_mask)
+        else:
+            self.available_mask = None
 
         if static is not None:
-            self.static = torch.tensor(static, dtype=torch.float)
+            self.static = torch.as_tensor(static, dtype=dtype)
             self.static_cols = static_cols
         else:
             self.static = static
@@ -110,26 +310,83 @@ class TimeSeriesDataset(Dataset):
 
     def __getitem__(self, idx):
         if isinstance(idx, int):
-            # Parse temporal data and pad its left
-            temporal = torch.zeros(
-                size=(len(self.temporal_cols), self.max_size), dtype=torch.float32
+            return self._get_item(idx, self.max_size)
+        raise ValueError(f"idx must be int, got {type(idx)}")
+
+    def _get_item(self, idx, max_size):
+        """Series `idx` left padded to `max_size` timestamps."""
+        # Parse temporal data and pad its left
+        temporal = torch.zeros(
+            size=(len(self.temporal_cols), max_size), dtype=self.temporal.dtype
+        )
+        ts = self.temporal[self.indptr[idx] : self.indptr[idx + 1], :]
+        temporal[: ts.shape[1], -len(ts) :] = ts.permute(1, 0)
+        if ts.shape[1] < len(self.temporal_cols):
+            temporal[-1, -len(ts) :] = self._mask_values(
+                torch.arange(self.indptr[idx], self.indptr[idx + 1])
             )
-            ts = self.temporal[self.indptr[idx] : self.indptr[idx + 1], :]
-            temporal[: len(self.temporal_cols), -len(ts) :] = ts.permute(1, 0)
 
-            # Add static data if available
-            static = None if self.static is None else self.static[idx, :]
+        # Add static data if available
+        static = None if self.static is None else self.static[idx, :]
 
-            item = dict(
-                temporal=temporal,
-                temporal_cols=self.temporal_cols,
-                static=static,
-                static_cols=self.static_cols,
-                y_idx=self.y_idx,
+        item = dict(
+            temporal=temporal,
+            temporal_cols=self.temporal_cols,
+            static=static,
+            static_cols=self.static_cols,
+            y_idx=self.y_idx,
+        )
+
+        return item
+
+    def __getitems__(self, idxs):
+        return self._get_items(idxs, self.max_size)
+
+    def _get_items(self, idxs, max_size):
+        """Series `idxs` left padded to `max_size` timestamps as a single [B, C, T] batch.
+
+        The column metadata isn't included, `TimeSeriesLoader` adds it once per batch.
+        """
+        temporal = torch.zeros(
+            size=(len(idxs), len(self.temporal_cols), max_size),
+            dtype=self.temporal.dtype,
+        )
+        self._gather(temporal, idxs, ends=np.full(len(idxs), max_size))
+        static = None if self.static is None else self.static[idxs]
+        return dict(temporal=temporal, static=static)
+
+    def _gather(self, out, idxs, ends):
+        """Copy the series `idxs` to the [B, C, T] tensor `out`, each one ending before `ends`."""
+        idxs = np.asarray(idxs)
+        starts = self.indptr[idxs]
+        sizes = self.indptr[idxs + 1] - starts
+        # Position of every timestamp within its series
+        offsets = np.arange(sizes.sum()) - np.repeat(sizes.cumsum() - sizes, sizes)
+        rows = torch.from_numpy(np.repeat(starts, sizes) + offsets)
+        b_idx = torch.from_numpy(np.repeat(np.arange(idxs.size), sizes))
+        t_idx = torch.from_numpy(np.repeat(ends - sizes, sizes) + offsets)
+        # the appended datasets can be stored with a different dtype
+        out.permute(0, 2, 1)[b_idx, t_idx, : self.temporal.shape[1]] = self.temporal[
+            rows
+        ].to(out.dtype)
+        if self.temporal.shape[1] < len(self.temporal_cols):
+            out[b_idx, -1, t_idx] = torch.as_tensor(
+                self._mask_values(rows), dtype=out.dtype
             )
 
-            return item
-        raise ValueError(f"idx must be int, got {type(idx)}")
+    def _mask_values(self, rows):
+        """available_mask at `rows` as floats."""
+        if self.available_mask is None:
+            return 1.0
+        return _unpack_mask(self.available_mask, rows)
+
+    def _unpacked_mask(self):
+        """available_mask of all the rows as booleans, None when all of them are available."""
+        if self.available_mask is None:
+            return None
+        return np.unpackbits(
+            self.available_mask.numpy(), count=self.temporal.shape[0]
+        ).astype(bool)
 
     def __len__(self):
         return self.n_groups
@@ -144,6 +401,38 @@ class TimeSeriesDataset(Dataset):
             self.indptr, other.indptr
         )
 
+    def _allocate_temporal(self, n_rows, n_cols):
+        """Storage for the temporal data of datasets derived from this one."""
+        return torch.empty(size=(n_rows, n_cols), dtype=self.temporal.dtype)
+
+    def _set_dtype(self, dtype):
+        """Store the temporal and static data with `dtype`, the batches are built with it as well."""
+        if dtype == torch.float16:
+            max_value = torch.finfo(torch.float16).max
+            for data in (self.temporal, self.static):
+                if data is None:
+                    continue
+                for i in range(data.shape[1]):
+                    values = data[:, i]
+                    if (values[torch.isfinite(values)].abs() > max_value).any():
+                        raise ValueError(
+                            "The data exceeds the range of float16, "
+                            "use bfloat16 or scale it with `local_scaler_type`."
+                        )
+        self.temporal = self.temporal.to(dtype)
+        if self.static is not None:
+            self.static = self.static.to(dtype)
+
+    def _share_memory(self):
+        """Move the data to shared memory in place, processes receive handles to it instead of copies.
+
+        Only called on the datasets built by `NeuralForecast`, so the data isn't duplicated.
+        """
+        for data in (self.temporal, self.static, self.available_mask):
+            if data is not None:
+                data.share_memory_()
+        return self
+
     def align(
         self, df: DataFrame, id_col: str, time_col: str, target_col: str
     ) -> "TimeSeriesDataset":
@@ -180,21 +469,36 @@ class TimeSeriesDataset(Dataset):
         # Define and fill new temporal with updated information
         len_temporal, col_temporal = self.temporal.shape
         len_futr = futr_dataset.temporal.shape[0]
-        new_temporal = torch.empty(size=(len_temporal + len_futr, col_temporal))
+        new_temporal = self._allocate_temporal(len_temporal + len_futr, col_temporal)
         new_sizes = np.diff(self.indptr) + np.diff(futr_dataset.indptr)
         new_indptr = np.append(0, new_sizes.cumsum()).astype(np.int32)
         new_max_size = np.max(new_sizes)
 
-        for i in range(self.n_groups):
-            curr_slice = slice(self.indptr[i], self.indptr[i + 1])
-            curr_size = curr_slice.stop - curr_slice.start
-            futr_slice = slice(futr_dataset.indptr[i], futr_dataset.indptr[i + 1])
-            new_temporal[new_indptr[i] : new_indptr[i] + curr_size] = self.temporal[
-                curr_slice
-            ]
-            new_temporal[new_indptr[i] + curr_size : new_indptr[i + 1]] = (
-                futr_dataset.temporal[futr_slice]
-            )
+        # Each series is shifted by the future rows of the previous ones
+        sizes = np.diff(self.indptr)
+        futr_sizes = np.diff(futr_dataset.indptr)
+        hist_rows = np.arange(len_temporal) + np.repeat(
+            new_indptr[:-1] - self.indptr[:-1], sizes
+        )
+        futr_rows = np.arange(len_futr) + np.repeat(
+            new_indptr[:-1] + sizes - futr_dataset.indptr[:-1], futr_sizes
+        )
+        new_temporal.index_copy_(0, torch.from_numpy(hist_rows), self.temporal)
+        new_temporal.index_copy_(
+            0,
+            torch.from_numpy(futr_rows),
+            futr_dataset.temporal[:, :col_temporal].to(new_temporal.dtype),
+        )
+        hist_mask = self._unpacked_mask()
+        futr_mask = futr_dataset._unpacked_mask()
+        if hist_mask is None and futr_mask is None:
+            new_mask = None
+        else:
+            new_mask = np.ones(len_temporal + len_futr, dtype=bool)
+            if hist_mask is not None:
+                new_mask[hist_rows] = hist_mask
+            if futr_mask is not None:
+                new_mask[futr_rows] = futr_mask
 
         # Define new dataset
         updated_dataset = TimeSeriesDataset(
@@ -207,10 +511,20 @@ class TimeSeriesDataset(Dataset):
             y_idx=self.y_idx,
             static_cols=self.static_cols,
             sorted=self.sorted,
+            available_mask=new_mask,
+            dtype=self.temporal.dtype,
         )
 
         return updated_dataset
 
+    def append_view(self, futr_dataset: "TimeSeriesDataset") -> "TimeSeriesDataset":
+        """Add future observations to the dataset without copying the history."""
+        if self.indptr.size != futr_dataset.indptr.size:
+            raise ValueError(
+                "Cannot append `futr_dataset` with different number of groups."
+            )
+        return _AppendedDataset(self, futr_dataset)
+
     @staticmethod
     def update_dataset(
         dataset, futr_df, id_col="unique_id", time_col="ds", target_col="y"
@@ -235,18 +549,22 @@ class TimeSeriesDataset(Dataset):
         # Define and fill new temporal with trimmed information
         len_temporal, col_temporal = dataset.temporal.shape
         total_trim = (left_trim + right_trim) * dataset.n_groups
-        new_temporal = torch.zeros(size=(len_temporal - total_trim, col_temporal))
-        new_indptr = [0]
-
-        acum = 0
-        for i in range(dataset.n_groups):
-            series_length = dataset.indptr[i + 1] - dataset.indptr[i]
-            new_length = series_length - left_trim - right_trim
-            new_temporal[acum : (acum + new_length), :] = dataset.temporal[
-                dataset.indptr[i] + left_trim : dataset.indptr[i + 1] - right_trim, :
-            ]
-            acum += new_length
-            new_indptr.append(acum)
+        new_temporal = dataset._allocate_temporal(
+            len_temporal - total_trim, col_temporal
+        )
+        new_sizes = np.diff(dataset.indptr) - left_trim - right_trim
+        new_indptr = np.append(0, new_sizes.cumsum())
+
+        # Rows kept from each series, gathered at once
+        rows = np.arange(new_indptr[-1]) + np.repeat(
+            dataset.indptr[:-1] + left_trim - new_indptr[:-1], new_sizes
+        )
+        torch.index_select(
+            dataset.temporal, 0, torch.from_numpy(rows), out=new_temporal
+        )
+        new_mask = dataset._unpacked_mask()
+        if new_mask is not None:
+            new_mask = new_mask[rows]
 
         new_max_size = dataset.max_size - left_trim - right_trim
         new_min_size = dataset.min_size - left_trim - right_trim
@@ -262,10 +580,40 @@ class TimeSeriesDataset(Dataset):
             static=dataset.static,
             static_cols=dataset.static_cols,
             sorted=dataset.sorted,
+            available_mask=new_mask,
+            dtype=dataset.temporal.dtype,
         )
 
         return updated_dataset
 
+    def _keep_last(self, n: int):
+        """Copy of the dataset with the last `n` timestamps of every serie and the positions of the kept rows."""
+        sizes = np.diff(self.indptr)
+        new_sizes = np.minimum(sizes, n)
+        new_indptr = np.append(0, new_sizes.cumsum()).astype(np.int32)
+        rows = np.arange(new_indptr[-1]) + np.repeat(
+            self.indptr[1:] - new_sizes - new_indptr[:-1], new_sizes
+        )
+        new_temporal = self._allocate_temporal(rows.size, self.temporal.shape[1])
+        torch.index_select(self.temporal, 0, torch.from_numpy(rows), out=new_temporal)
+        new_mask = self._unpacked_mask()
+        if new_mask is not None:
+            new_mask = new_mask[rows]
+        dataset = TimeSeriesDataset(
+            temporal=new_temporal,
+            temporal_cols=self.temporal_cols.copy(),
+            indptr=new_indptr,
+            max_size=new_sizes.max(),
+            min_size=new_sizes.min(),
+            y_idx=self.y_idx,
+            static=self.static,
+            static_cols=self.static_cols,
+            sorted=self.sorted,
+            available_mask=new_mask,
+            dtype=self.temporal.dtype,
+        )
+        return dataset, rows
+
     @staticmethod
     def from_df(
         df,
@@ -274,7 +622,11 @@ class TimeSeriesDataset(Dataset):
         id_col="unique_id",
         time_col="ds",
         target_col="y",
+        exog_cols=None,
+        stat_exog_cols=None,
     ):
+        # exog_cols and stat_exog_cols restrict the exogenous columns of df and static_df,
+        # all of them are kept when they're None
         # TODO: protect on equality of static_df + df indexes
         if isinstance(df, pd.DataFrame) and df.index.name == id_col:
             warnings.warn(
@@ -292,17 +644,49 @@ class TimeSeriesDataset(Dataset):
             if sort_df:
                 static_df = ufp.sort(static_df, by=id_col)
 
-        ids, times, data, indptr, sort_idxs = ufp.process_df(
-            df, id_col, time_col, target_col
-        )
-        # processor sets y as the first column
-        temporal_cols = pd.Index(
-            [target_col]
-            + [c for c in df.columns if c not in (id_col, time_col, target_col)]
-        )
-        temporal = data.astype(np.float32, copy=False)
+        if isinstance(df, (pd.DataFrame, pl_DataFrame)):
+            ufp.validate_format(df, id_col, time_col, target_col)
+            keys = df
+            # y is the first column
+            temporal_cols = _value_cols(
+                df.columns, id_col, time_col, target_col, exog_cols
+            )
+            has_mask = "available_mask" in df.columns
+        else:
+            # iterable of dataframes or directory with parquet files
+            df = _Partitions(
+                df,
+                id_col=id_col,
+                time_col=time_col,
+                target_col=target_col,
+                exog_cols=exog_cols,
+            )
+            keys = df.keys
+            temporal_cols = df.value_cols
+            has_mask = df.has_mask
+        id_counts = ufp.counts_by_id(keys, id_col)
+        ids = id_counts[id_col]
+        indptr = np.append(0, id_counts["counts"].to_numpy().cumsum()).astype(np.int32)
+        sort_idxs = ufp.maybe_compute_sort_indices(keys, id_col, time_col)
+        ds = keys[time_col].to_numpy()
+        if sort_idxs is not None:
+            ds = ds[sort_idxs]
+        times = ds[indptr[1:] - 1]
+
+        # the float32 block is filled once, the available mask is kept apart
+        if isinstance(df, _Partitions):
+            temporal = df.to_float32_block(sort_idxs)
+            available_mask = df.to_mask(sort_idxs) if has_mask else None
+        else:
+            temporal = _to_float32_block(df, temporal_cols, sort_idxs)
+            if has_mask:
+                available_mask = _to_float32_block(df, ["available_mask"], sort_idxs)[
+                    :, 0
+                ].astype(bool)
+            else:
+                available_mask = None
         indices = ids
-        if isinstance(df, pd.DataFrame):
+        if isinstance(keys, pd.DataFrame):
             dates = pd.Index(times, name=time_col)
         else:
             dates = pl_Series(time_col, times)
@@ -310,15 +694,18 @@ class TimeSeriesDataset(Dataset):
         max_size = max(sizes)
         min_size = min(sizes)
 
-        # Add Available mask efficiently (without adding column to df)
-        if "available_mask" not in df.columns:
-            available_mask = np.ones((len(temporal), 1), dtype=np.float32)
-            temporal = np.append(temporal, available_mask, axis=1)
-            temporal_cols = temporal_cols.append(pd.Index(["available_mask"]))
+        # Available mask is always the last column
+        temporal_cols = temporal_cols.append(pd.Index(["available_mask"]))
 
         # Static features
+        static_cols = None
         if static_df is not None:
-            static_cols = [col for col in static_df.columns if col != id_col]
+            static_cols = [
+                col
+                for col in static_df.columns
+                if col != id_col and (stat_exog_cols is None or col in stat_exog_cols)
+            ]
+        if static_cols:
             static = ufp.to_numpy(static_df[static_cols])
             static_cols = pd.Index(static_cols)
         else:
@@ -335,13 +722,396 @@ class TimeSeriesDataset(Dataset):
             min_size=min_size,
             sorted=sort_df,
             y_idx=0,
+            available_mask=available_mask,
         )
-        ds = df[time_col].to_numpy()
-        if sort_idxs is not None:
-            ds = ds[sort_idxs]
         return dataset, indices, dates, ds
 
-# %% ../nbs/tsdataset.ipynb 10
+# %% ../nbs/tsdataset.ipynb 11
+class _AppendedDataset(TimeSeriesDataset):
+    """History of a dataset followed by its future observations.
+
+    Items are padded from both segments, so building it only costs the new boundaries.
+    The concatenated `temporal` and `available_mask` are materialized the first time
+    they're accessed."""
+
+    def __init__(self, dataset: TimeSeriesDataset, futr_dataset: TimeSeriesDataset):
+        self.dataset = dataset
+        self.futr_dataset = futr_dataset
+        self.temporal_cols = dataset.temporal_cols.copy()
+        self.static = dataset.static
+        self.static_cols = dataset.static_cols
+
+        new_sizes = np.diff(dataset.indptr) + np.diff(futr_dataset.indptr)
+        self.indptr = np.append(0, new_sizes.cumsum()).astype(np.int32)
+        self.n_groups = self.indptr.size - 1
+        self.max_size = np.max(new_sizes)
+        self.min_size = dataset.min_size
+        self.y_idx = dataset.y_idx
+
+        self.updated = False
+        self.sorted = dataset.sorted
+        self._appended = None
+
+    def _materialize(self):
+        if self._appended is None:
+            self._appended = self.dataset.append(self.futr_dataset)
+        return self._appended
+
+    def _share_memory(self):
+        self.dataset._share_memory()
+        self.futr_dataset._share_memory()
+        if self._appended is not None:
+            self._appended._share_memory()
+        return self
+
+    @property
+    def temporal(self):
+        return self._materialize().temporal
+
+    @property
+    def available_mask(self):
+        return self._materialize().available_mask
+
+    def _get_item(self, idx, max_size):
+        n_cols = self.dataset.temporal.shape[1]
+        hist = self.dataset.temporal[
+            self.dataset.indptr[idx] : self.dataset.indptr[idx + 1]
+        ]
+        futr = self.futr_dataset.temporal[
+            self.futr_dataset.indptr[idx] : self.futr_dataset.indptr[idx + 1], :n_cols
+        ]
+        futr_start = max_size - len(futr)
+        hist_start = futr_start - len(hist)
+
+        # Parse temporal data from both segments and pad its left
+        temporal = torch.zeros(
+            size=(len(self.temporal_cols), max_size), dtype=self.dataset.temporal.dtype
+        )
+        temporal[:n_cols, hist_start:futr_start] = hist.permute(1, 0)
+        temporal[:n_cols, futr_start:] = futr.permute(1, 0)
+        if n_cols < len(self.temporal_cols):
+            hist_rows = torch.arange(
+                self.dataset.indptr[idx], self.dataset.indptr[idx + 1]
+            )
+            futr_rows = torch.arange(
+                self.futr_dataset.indptr[idx], self.futr_dataset.indptr[idx + 1]
+            )
+            temporal[-1, hist_start:futr_start] = self.dataset._mask_values(hist_rows)
+            temporal[-1, futr_start:] = self.futr_dataset._mask_values(futr_rows)
+
+        # Add static data if available
+        static = None if self.static is None else self.static[idx, :]
+
+        item = dict(
+            temporal=temporal,
+            temporal_cols=self.temporal_cols,
+            static=static,
+            static_cols=self.static_cols,
+            y_idx=self.y_idx,
+        )
+
+        return item
+
+    def _get_items(self, idxs, max_size):
+        temporal = torch.zeros(
+            size=(len(idxs), len(self.temporal_cols), max_size),
+            dtype=self.dataset.temporal.dtype,
+        )
+        futr_indptr = self.futr_dataset.indptr
+        futr_sizes = futr_indptr[np.asarray(idxs) + 1] - futr_indptr[idxs]
+        self.dataset._gather(temporal, idxs, ends=max_size - futr_sizes)
+        self.futr_dataset._gather(temporal, idxs, ends=np.full(len(idxs), max_size))
+        static = None if self.static is None else self.static[idxs]
+        return dict(temporal=temporal, static=static)
+
+    def __repr__(self):
+        return (
+            f"TimeSeriesDataset(n_data={self.indptr[-1]:,}, n_groups={self.n_groups:,})"
+        )
+
+# %% ../nbs/tsdataset.ipynb 12
+class MemmapTimeSeriesDataset(TimeSeriesDataset):
+    """Memory-mapped TimeSeriesDataset.
+
+    Stores the temporal data, the available mask, the series boundaries and the static features as `.npy` files
+    in a local directory and maps them lazily, so only the pages touched by `__getitem__`,
+    `append` and `trim_dataset` are read from disk. The files are mapped copy-on-write,
+    in-place modifications never reach them.
+
+    The series ids, last dates and timestamps are stored as well, so the dataset can be passed
+    to `NeuralForecast.fit`, `predict` and `cross_validation` in place of the dataframe.
+
+    **Parameters:**<br>
+    `path`: str, local directory written by `MemmapTimeSeriesDataset.from_df` or `MemmapTimeSeriesDataset.from_parquet`.<br>
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(os.path.join(self.path, "metadata.pkl"), "rb") as f:
+            metadata = pickle.load(f)
+        temporal = np.load(os.path.join(self.path, "temporal.npy"), mmap_mode="c")
+        indptr = np.load(os.path.join(self.path, "indptr.npy"))
+        if metadata["static_cols"] is not None:
+            static = np.load(os.path.join(self.path, "static.npy"), mmap_mode="c")
+        else:
+            static = None
+        super().__init__(
+            temporal=temporal,
+            temporal_cols=metadata["temporal_cols"],
+            indptr=indptr,
+            max_size=metadata["max_size"],
+            min_size=metadata["min_size"],
+            y_idx=metadata["y_idx"],
+            static=static,
+            static_cols=metadata["static_cols"],
+            sorted=metadata["sorted"],
+        )
+        if metadata["available_mask"]:
+            self.available_mask = torch.from_numpy(
+                np.load(os.path.join(self.path, "available_mask.npy"), mmap_mode="c")
+            )
+        self.uids = metadata["uids"]
+        self.last_dates = metadata["last_dates"]
+        if metadata["ds"] is not None:
+            self.ds = metadata["ds"]
+        else:
+            self.ds = np.load(os.path.join(self.path, "ds.npy"), mmap_mode="r")
+
+    def __repr__(self):
+        return f"MemmapTimeSeriesDataset(n_data={self.temporal.shape[0]:,}, n_groups={self.n_groups:,}, path={self.path!r})"
+
+    def __getstate__(self):
+        # the processes of `n_jobs` map the files again instead of copying the data,
+        # `NeuralForecast.save` writes the files next to the models
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _share_memory(self):
+        # processes map the files again
+        return self
+
+    def _allocate_temporal(self, n_rows, n_cols):
+        # the directory of the dataset is left untouched
+        tmpdir = tempfile.TemporaryDirectory()
+        temporal = np.lib.format.open_memmap(
+            os.path.join(tmpdir.name, "temporal.npy"),
+            mode="w+",
+            dtype=self.temporal.numpy().dtype,
+            shape=(n_rows, n_cols),
+        )
+        # remove the file once the derived dataset is released
+        weakref.finalize(temporal, tmpdir.cleanup)
+        return torch.from_numpy(temporal)
+
+    @staticmethod
+    def _write(path, dataset, uids, last_dates, ds):
+        fs, path = fsspec.core.url_to_fs(path)
+        fs.makedirs(path, exist_ok=True)
+
+        def save(name, array):
+            with fs.open(f"{path}/{name}.npy", "wb") as f:
+                np.save(f, array)
+
+        save("temporal", dataset.temporal.numpy())
+        save("indptr", np.asarray(dataset.indptr))
+        if dataset.static is not None:
+            save("static", dataset.static.numpy())
+        if dataset.available_mask is not None:
+            save("available_mask", dataset.available_mask.numpy())
+        # object arrays can't be memory-mapped, keep them with the metadata
+        if ds.dtype == object:
+            ds_meta = ds
+        else:
+            ds_meta = None
+            save("ds", ds)
+        metadata = dict(
+            temporal_cols=dataset.temporal_cols,
+            static_cols=dataset.static_cols,
+            max_size=dataset.max_size,
+            min_size=dataset.min_size,
+            y_idx=dataset.y_idx,
+            sorted=dataset.sorted,
+            available_mask=dataset.available_mask is not None,
+            uids=uids,
+            last_dates=last_dates,
+            ds=ds_meta,
+        )
+        with fs.open(f"{path}/metadata.pkl", "wb") as f:
+            pickle.dump(metadata, f)
+
+    @staticmethod
+    def from_df(
+        df,
+        path,
+        static_df=None,
+        sort_df=False,
+        id_col="unique_id",
+        time_col="ds",
+        target_col="y",
+    ):
+        """Build the dataset from `df` and store it in the `path` directory."""
+        dataset, uids, last_dates, ds = TimeSeriesDataset.from_df(
+            df=df,
+            static_df=static_df,
+            sort_df=sort_df,
+            id_col=id_col,
+            time_col=time_col,
+            target_col=target_col,
+        )
+        MemmapTimeSeriesDataset._write(path, dataset, uids, last_dates, ds)
+        del dataset
+        dataset = MemmapTimeSeriesDataset(path)
+        return dataset, dataset.uids, dataset.last_dates, dataset.ds
+
+    @staticmethod
+    def from_parquet(
+        directory,
+        path,
+        static_df=None,
+        sort_df=False,
+        id_col="unique_id",
+        time_col="ds",
+        target_col="y",
+    ):
+        """Build the dataset from the parquet files in `directory` and store it in the `path` directory."""
+        return MemmapTimeSeriesDataset.from_df(
+            df=directory,
+            path=path,
+            static_df=static_df,
+            sort_df=sort_df,
+            id_col=id_col,
+            time_col=time_col,
+            target_col=target_col,
+        )
+
+# %% ../nbs/tsdataset.ipynb 14
+class _LengthBucketSampler(Sampler):
+    """Batches of series with similar lengths.
+
+    The series are sorted by length and split into batches once, only the order of the
+    batches changes between epochs. `pad_sizes` holds the size of the longest series
+    in the batch of each series plus `padding`, capped at the longest series overall."""
+
+    def __init__(self, sizes, batch_size, shuffle=True, drop_last=False, padding=0):
+        order = np.argsort(sizes, kind="stable")
+        self.batches = [
+            order[i : i + batch_size] for i in range(0, order.size, batch_size)
+        ]
+        if drop_last and self.batches and self.batches[-1].size < batch_size:
+            self.batches.pop()
+        self.pad_sizes = np.zeros_like(sizes)
+        for batch in self.batches:
+            self.pad_sizes[batch] = min(sizes[batch].max() + padding, sizes.max())
+        self.shuffle = shuffle
+
+    def __iter__(self):
+        if self.shuffle:
+            order = np.random.permutation(len(self.batches))
+        else:
+            order = range(len(self.batches))
+        for i in order:
+            yield self.batches[i].tolist()
+
+    def __len__(self):
+        return len(self.batches)
+
+
+class _BucketedDataset(Dataset):
+    """Pads each series to the longest series of its batch instead of the whole dataset."""
+
+    def __init__(self, dataset: TimeSeriesDataset, pad_sizes):
+        super().__init__()
+        self.dataset = dataset
+        self.pad_sizes = pad_sizes
+        self.temporal_cols = dataset.temporal_cols
+        self.static_cols = dataset.static_cols
+        self.y_idx = dataset.y_idx
+
+    def __getitem__(self, idx):
+        return self.dataset._get_item(idx, int(self.pad_sizes[idx]))
+
+    def __getitems__(self, idxs):
+        return self.dataset._get_items(idxs, int(self.pad_sizes[idxs].max()))
+
+    def __len__(self):
+        return len(self.dataset)
+
+
+class _SeriesSubsetSampler(Sampler):
+    """Series of consecutive chunks of `subset_size` series, in the order of the dataset.
+
+    Batched with `batch_size=subset_size`. The last chunk starts `overlap` series early,
+    so every batch has `subset_size` series. The chunks are the same for training,
+    validation and predict, so each series always takes the same position in its batch.
+    """
+
+    def __init__(self, n_groups, subset_size):
+        if n_groups < subset_size:
+            raise ValueError(
+                f"The dataset has {n_groups} series, less than the subsets of {subset_size}."
+            )
+        self.n_groups = n_groups
+        self.subset_size = subset_size
+        self.overlap = -n_groups % subset_size
+
+    def __iter__(self):
+        starts = np.arange(0, self.n_groups, self.subset_size)
+        starts = np.minimum(starts, self.n_groups - self.subset_size)
+        subsets = starts[:, None] + np.arange(self.subset_size)
+        return iter(subsets.ravel().tolist())
+
+    def __len__(self):
+        return -(-self.n_groups // self.subset_size) * self.subset_size
+
+# %% ../nbs/tsdataset.ipynb 15
+class _DeviceBatches:
+    """Training batches drawn from a copy of the whole dataset kept on `device`.
+
+    Replaces the `TimeSeriesLoader` of the training set for panels that fit in the
+    device memory. The series are padded to the longest one once, every epoch they're
+    shuffled with torch's generator and each batch is gathered on the device."""
+
+    def __init__(self, dataset, batch_size, device, shuffle=True, drop_last=False):
+        all_series = dataset.__getitems__(list(range(len(dataset))))
+        self.temporal = all_series["temporal"].to(device)
+        self.static = (
+            all_series["static"].to(device)
+            if all_series["static"] is not None
+            else None
+        )
+        self.temporal_cols = dataset.temporal_cols
+        self.static_cols = dataset.static_cols
+        self.y_idx = dataset.y_idx
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+
+    def __len__(self):
+        n_series = self.temporal.shape[0]
+        if self.drop_last:
+            return n_series // self.batch_size
+        return -(-n_series // self.batch_size)
+
+    def __iter__(self):
+        n_series = self.temporal.shape[0]
+        if self.shuffle:
+            order = torch.randperm(n_series, device=self.temporal.device)
+        else:
+            order = torch.arange(n_series, device=self.temporal.device)
+        for i in range(len(self)):
+            idxs = order[i * self.batch_size : (i + 1) * self.batch_size]
+            batch = dict(
+                temporal=self.temporal[idxs],
+                temporal_cols=self.temporal_cols,
+                y_idx=self.y_idx,
+            )
+            if self.static is not None:
+                batch.update(static=self.static[idxs], static_cols=self.static_cols)
+            yield batch
+
+# %% ../nbs/tsdataset.ipynb 17
 class TimeSeriesDataModule(pl.LightningDataModule):
 
     def __init__(
@@ -352,16 +1122,63 @@ class TimeSeriesDataModule(pl.LightningDataModule):
         num_workers=0,
         drop_last=False,
         shuffle_train=True,
+        bucket_by_length=False,
+        bucket_padding=0,
+        device_batches=False,
+        series_subset_size=None,
     ):
         super().__init__()
+        if bucket_by_length and device_batches:
+            raise ValueError(
+                "`bucket_by_length` and `device_batches` can't be combined."
+            )
+        if (series_subset_size is not None) and (bucket_by_length or device_batches):
+            raise ValueError(
+                "`series_subset_size` can't be combined with `bucket_by_length` or `device_batches`."
+            )
         self.dataset = dataset
         self.batch_size = batch_size
         self.valid_batch_size = valid_batch_size
         self.num_workers = num_workers
         self.drop_last = drop_last
         self.shuffle_train = shuffle_train
+        self.bucket_by_length = bucket_by_length
+        self.bucket_padding = bucket_padding
+        self.device_batches = device_batches
+        self.series_subset_size = series_subset_size
 
     def train_dataloader(self):
+        if self.device_batches:
+            device = torch.device("cpu")
+            if self.trainer is not None:
+                if self.trainer.world_size > 1:
+                    raise ValueError(
+                        "`device_batches` is not supported with distributed training."
+                    )
+                device = self.trainer.strategy.root_device
+            return _DeviceBatches(
+                self.dataset,
+                batch_size=self.batch_size,
+                device=device,
+                shuffle=self.shuffle_train,
+                drop_last=self.drop_last,
+            )
+        if self.bucket_by_length:
+            sampler = _LengthBucketSampler(
+                sizes=np.diff(self.dataset.indptr),
+                batch_size=self.batch_size,
+                shuffle=self.shuffle_train,
+                drop_last=self.drop_last,
+                padding=self.bucket_padding,
+            )
+            loader = TimeSeriesLoader(
+                _BucketedDataset(self.dataset, sampler.pad_sizes),
+                batch_sampler=sampler,
+                num_workers=self.num_workers,
+            )
+            return loader
+        if self.series_subset_size is not None:
+            return self._series_subset_loader()
         loader = TimeSeriesLoader(
             self.dataset,
             batch_size=self.batch_size,
@@ -372,6 +1189,8 @@ class TimeSeriesDataModule(pl.LightningDataModule):
         return loader
 
     def val_dataloader(self):
+        if self.series_subset_size is not None:
+            return self._series_subset_loader()
         loader = TimeSeriesLoader(
             self.dataset,
             batch_size=self.valid_batch_size,
@@ -382,6 +1201,8 @@ class TimeSeriesDataModule(pl.LightningDataModule):
         return loader
 
     def predict_dataloader(self):
+        if self.series_subset_size is not None:
+            return self._series_subset_loader()
         loader = TimeSeriesLoader(
             self.dataset,
             batch_size=self.valid_batch_size,
@@ -389,3 +1210,22 @@ class TimeSeriesDataModule(pl.LightningDataModule):
             shuffle=False,
         )
         return loader
+
+    def _series_subset_loader(self):
+        # multivariate models of a fixed number of series on larger panels
+        sampler = _SeriesSubsetSampler(
+            n_groups=len(self.dataset), subset_size=self.series_subset_size
+        )
+        return TimeSeriesLoader(
+            self.dataset,
+            sampler=sampler,
+            batch_size=self.series_subset_size,
+            num_workers=self.num_workers,
+        )
+
+    def on_after_batch_transfer(self, batch, dataloader_idx):
+        # datasets may be stored in reduced precision, the models work in float32
+        for key in ("temporal", "static"):
+            if batch.get(key) is not None and batch[key].dtype != torch.float32:
+                batch[key] = batch[key].float()
+        return batch